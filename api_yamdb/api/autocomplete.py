@@ -0,0 +1,152 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from reviews.models import Category, Genre, Title
+from users.models import CustomUser
+
+from .cache import version_key
+
+
+class PrefixIndex:
+    """Per-process sorted array of names answering prefix lookups.
+
+    Entries are ``(key, ident, label)`` tuples ordered by the casefolded
+    label, so the matches of a prefix are a contiguous run found with
+    bisect. Saves and deletes of this process are applied in place by
+    the signal receivers. Changes made by other processes bump the model
+    version in the cache, the index notices it on lookup and is rebuilt,
+    at most once per ``AUTOCOMPLETE_REFRESH`` seconds, and in any case
+    after ``AUTOCOMPLETE_MAX_AGE``. Lookups keep reading the previous
+    array while it is rebuilt, and hold the lock only while they bisect.
+    """
+
+    def __init__(self, model, ident_field, label_field):
+        self.model = model
+        self.ident_field = ident_field
+        self.label_field = label_field
+        self.entries = []
+        self.by_pk = {}
+        self.version = None
+        self.built_at = None
+        self.lock = threading.Lock()
+        self.rebuilding = False
+
+    def make_entry(self, ident, label):
+        key = label.casefold()
+        # Most usernames and slugs are lowercase already, share the string.
+        return (label if key == label else key, ident, label)
+
+    def rows(self):
+        fields = ['pk', self.ident_field, self.label_field]
+        return self.model.objects.order_by().values_list(*fields).iterator()
+
+    def rebuild(self, version):
+        by_pk = {
+            pk: self.make_entry(ident, label)
+            for pk, ident, label in self.rows()
+        }
+        entries = sorted(by_pk.values())
+        with self.lock:
+            self.entries, self.by_pk = entries, by_pk
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def is_stale(self, version):
+        if self.built_at is None:
+            return True
+        age = time.monotonic() - self.built_at
+        # The age limit covers caches that are not shared between
+        # processes, where versions of other processes are never seen.
+        return age > settings.AUTOCOMPLETE_MAX_AGE or (
+            version != self.version and age > settings.AUTOCOMPLETE_REFRESH)
+
+    def refresh(self, version):
+        """Rebuild the index if it lags behind the version."""
+        with self.lock:
+            if self.rebuilding or not self.is_stale(version):
+                return
+            self.rebuilding = True
+        try:
+            self.rebuild(version)
+        finally:
+            self.rebuilding = False
+
+    def lookup(self, prefix, limit):
+        # apply() edits the array in place, the lock covers the bisect
+        # and the slice, both short next to a copy of the whole array.
+        with self.lock:
+            index = bisect_left(self.entries, (prefix,))
+            candidates = self.entries[index:index + limit]
+        matches = []
+        for key, ident, label in candidates:
+            if not key.startswith(prefix):
+                break
+            matches.append({self.ident_field: ident, self.label_field: label})
+        return matches
+
+    def apply(self, instance, version, deleted):
+        """Put the saved instance in place, or drop a deleted one."""
+        deleted = deleted or getattr(instance, 'deleted_at', None)
+        with self.lock:
+            old = self.by_pk.pop(instance.pk, None)
+            if old is not None:
+                del self.entries[bisect_left(self.entries, old)]
+            if not deleted:
+                entry = self.make_entry(
+                    getattr(instance, self.ident_field),
+                    getattr(instance, self.label_field))
+                self.by_pk[instance.pk] = entry
+                insort(self.entries, entry)
+            # Another process changed the model in between, so rebuild.
+            if self.version is not None and version != self.version + 1:
+                self.version = None
+            else:
+                self.version = version
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class Autocomplete:
+    """The prefix indexes of the autocomplete endpoint by section."""
+
+    def __init__(self, indexes):
+        self.indexes = indexes
+        self.by_model = {index.model: index for index in indexes.values()}
+
+    def refresh(self, sections):
+        indexes = [self.indexes[section] for section in sections]
+        versions = cache.get_many(
+            [version_key(index.model) for index in indexes])
+        for index in indexes:
+            index.refresh(versions.get(version_key(index.model)))
+
+    def lookup(self, prefix, sections, limit):
+        self.refresh(sections)
+        prefix = prefix.casefold()
+        return {
+            section: self.indexes[section].lookup(prefix, limit)
+            for section in sections
+        }
+
+    def apply(self, instance, version, deleted=False):
+        index = self.by_model.get(type(instance))
+        if index is not None and index.built_at is not None:
+            index.apply(instance, version, deleted)
+
+    def clear(self):
+        for index in self.indexes.values():
+            with index.lock:
+                index.entries, index.by_pk = [], {}
+                index.version = index.built_at = None
+
+
+autocomplete = Autocomplete({
+    'titles': PrefixIndex(Title, 'id', 'name'),
+    'genres': PrefixIndex(Genre, 'slug', 'name'),
+    'categories': PrefixIndex(Category, 'slug', 'name'),
+    'users': PrefixIndex(CustomUser, 'username', 'username'),
+})
@@ -0,0 +1,196 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .metrics import measure_serialization
+
+LEAF, ONE, MANY = range(3)
+
+
+class UnsupportedFieldError(Exception):
+    pass
+
+
+class CompiledSerializer:
+    """Read path of a ModelSerializer built on ``values()`` rows.
+
+    The fields of the serializer are resolved once: plain fields become a
+    column with the ``to_representation`` of the field, slug relations and
+    nested to-one serializers become joined columns, nested many-to-many
+    serializers are read with one query per batch of rows. Nested objects
+    are built once per batch and shared between the rows.
+    """
+
+    def __init__(self, serializer, model, prefix=''):
+        self.key = prefix[:-2] if prefix else 'pk'
+        self.columns = [self.key]
+        self.fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            self.fields.append(self.compile_field(name, field, model, prefix))
+
+    def compile_field(self, name, field, model, prefix):
+        source = field.source
+        if source == '*' or '.' in source:
+            raise UnsupportedFieldError(name)
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise UnsupportedFieldError(name)
+        if isinstance(field, serializers.ListSerializer):
+            if not (isinstance(field.child, serializers.ModelSerializer)
+                    and model_field.many_to_many and model_field.concrete):
+                raise UnsupportedFieldError(name)
+            related = model_field.related_model
+            return name, MANY, (
+                related._default_manager,
+                model_field.related_query_name(),
+                CompiledSerializer(field.child, related),
+            )
+        if model_field.is_relation:
+            return self.compile_relation(
+                name, field, model_field, prefix + source)
+        # These fields read the whole object or the request context.
+        if (isinstance(field, (serializers.Serializer,
+                               serializers.SerializerMethodField,
+                               serializers.ModelField,
+                               serializers.HiddenField,
+                               serializers.FileField))
+                or field.to_representation.__func__ is (
+                    serializers.Field.to_representation)):
+            raise UnsupportedFieldError(name)
+        column = prefix + source
+        self.columns.append(column)
+        return name, LEAF, (column, field.to_representation)
+
+    def compile_relation(self, name, field, model_field, path):
+        if not (model_field.many_to_one or model_field.one_to_one):
+            raise UnsupportedFieldError(name)
+        if isinstance(field, serializers.ModelSerializer):
+            nested = CompiledSerializer(
+                field, model_field.related_model, prefix=f'{path}__')
+            if any(kind is MANY for _, kind, _ in nested.fields):
+                raise UnsupportedFieldError(name)
+            self.columns.extend(nested.columns)
+            return name, ONE, nested
+        if type(field) is serializers.SlugRelatedField:
+            column = f'{path}__{field.slug_field}'
+            self.columns.append(column)
+            return name, LEAF, (column, None)
+        raise UnsupportedFieldError(name)
+
+    def values(self, queryset):
+        """Turn the queryset into the rows this serializer reads."""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        related = [
+            self.load_many(rows, *spec)
+            for _, kind, spec in self.fields if kind is MANY
+        ]
+        return [self.build(row, related, {}) for row in rows]
+
+    def load_many(self, rows, manager, query_name, nested):
+        """Map owner keys to lists of nested objects in query order."""
+        keys = {row[self.key] for row in rows}
+        if not keys:
+            return {}
+        owners = []
+        nested_rows = []
+        for row in manager.filter(**{f'{query_name}__in': keys}).values(
+                query_name, *nested.columns):
+            owners.append(row[query_name])
+            nested_rows.append(row)
+        items = {}
+        built = {}
+        for owner, row, data in zip(
+                owners, nested_rows, nested.serialize(nested_rows)):
+            items.setdefault(owner, []).append(
+                built.setdefault(row[nested.key], data))
+        return items
+
+    def build(self, row, related, shared):
+        data = {}
+        many = iter(related)
+        for name, kind, spec in self.fields:
+            if kind is LEAF:
+                column, to_representation = spec
+                value = row[column]
+                if value is not None and to_representation is not None:
+                    value = to_representation(value)
+                data[name] = value
+            elif kind is ONE:
+                pk = row[spec.key]
+                if pk is None:
+                    data[name] = None
+                    continue
+                cache = shared.setdefault(id(spec), {})
+                if pk not in cache:
+                    cache[pk] = spec.build(row, (), shared)
+                data[name] = cache[pk]
+            else:
+                data[name] = next(many).get(row[self.key], [])
+        return data
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class, field_names=None):
+    """Compiled read path of the serializer class, None if unsupported.
+
+    With field_names only those fields are compiled, so the rows skip the
+    columns, joins and queries of the others.
+    """
+    serializer = serializer_class()
+    if field_names is not None:
+        for name in list(serializer.fields):
+            if name not in field_names:
+                del serializer.fields[name]
+    try:
+        return CompiledSerializer(serializer, serializer.Meta.model)
+    except (UnsupportedFieldError, AttributeError):
+        return None
+
+
+class CompiledListMixin:
+    """Serialize list pages with the compiled read path when possible.
+
+    Turned off by ``COMPILED_SERIALIZERS = False``; serializers with fields
+    the compiler does not know fall back to DRF.
+    """
+
+    def get_field_names(self):
+        """Names of the serializer fields to render, None for all."""
+
+    def get_compiled_serializer(self):
+        if not settings.COMPILED_SERIALIZERS:
+            return None
+        return compile_serializer(
+            self.get_serializer_class(), self.get_field_names())
+
+    def get_list_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        compiled = self.get_compiled_serializer()
+        if compiled is not None:
+            queryset = compiled.values(queryset)
+        return queryset
+
+    def serialize_list(self, objects):
+        compiled = self.get_compiled_serializer()
+        with measure_serialization(self.request):
+            if compiled is not None:
+                return compiled.serialize(objects)
+            return self.get_serializer(objects, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        if self.get_compiled_serializer() is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_list(page))
+        return Response(self.serialize_list(queryset))
@@ -0,0 +1,77 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .cache import get_version
+
+
+def count_sql(queryset):
+    return queryset.order_by().values('pk').query.sql_with_params()
+
+
+def is_unfiltered(queryset):
+    """Whether the queryset selects what the default manager does."""
+    base = queryset.model._default_manager.using(queryset.db).all()
+    return count_sql(queryset) == count_sql(base)
+
+
+def planner_estimate(queryset):
+    """Rows PostgreSQL estimates the table has, None when it can't tell."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    # A table that was never analyzed has no estimate, -1 or 0 rows.
+    if row is None or row[0] <= 0:
+        return None
+    return int(row[0])
+
+
+def cached_count(queryset):
+    """Exact count, cached until the model changes or the TTL runs out."""
+    model = queryset.model
+    sql = f'{queryset.db}:{count_sql(queryset)}'
+    key = (f'count:{model._meta.label_lower}:{get_version(model)}:'
+           f'{hashlib.md5(sql.encode()).hexdigest()}')
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.COUNT_CACHE_TTL)
+    return count
+
+
+def approximate_count(queryset):
+    """Row count of a list without a COUNT(*) on every request.
+
+    Unfiltered tables of at least ``COUNT_ESTIMATE_THRESHOLD`` rows report
+    the planner estimate, which may be off by a few percent. Other lists
+    are counted exactly and the count is cached for ``COUNT_CACHE_TTL``
+    seconds or until a row of the model is saved or deleted. Changes of
+    related rows, such as the genres of a title, show up with the TTL.
+    """
+    try:
+        if is_unfiltered(queryset):
+            estimate = planner_estimate(queryset)
+            if (estimate is not None
+                    and estimate >= settings.COUNT_ESTIMATE_THRESHOLD):
+                return estimate
+        return cached_count(queryset)
+    except EmptyResultSet:
+        return 0
+
+
+class ApproximateCountPaginator(Paginator):
+    """Admin changelist paginator counting with ``approximate_count``."""
+
+    @cached_property
+    def count(self):
+        return approximate_count(self.object_list)
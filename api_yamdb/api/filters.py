@@ -1,13 +1,83 @@
+from django.db import connections
+from django.db.models import F, Subquery
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from django_filters.constants import EMPTY_VALUES
+from reviews.genres import filter_by_genres
+from reviews.models import Category, Title
+from reviews.search import get_title_search
+
+ORDERING_FIELDS = ('rating', 'year', 'review_count', 'name')
+# Title fields the search parameters look in.
+SEARCH_FIELDS = {'name': ('name',), 'q': ('name', 'description')}
+
+
+class TitleOrderingFilter(filters.OrderingFilter):
+    """Ordering by allowed fields, the id breaks ties.
+
+    The id follows the direction of the last field, so a single-field
+    order, with or without a category, is a scan of one of the title
+    indexes. Unrated titles come last in ``-rating``.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value]
+        if connections[qs.db].vendor == 'postgresql':
+            # SQLite already sorts NULLs last when descending.
+            ordering = [
+                F('rating').desc(nulls_last=True) if field == '-rating'
+                else field for field in ordering
+            ]
+        tie_breaker = '-id' if value[-1].startswith('-') else 'id'
+        return qs.order_by(*ordering, tie_breaker)
 
 
 class TitleFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name='name', lookup_expr='contains')
-    category = filters.CharFilter(field_name='category__slug',
-                                  lookup_expr='exact')
-    genre = filters.CharFilter(field_name='genre__slug', lookup_expr='exact')
+    name = filters.CharFilter(method='search')
+    q = filters.CharFilter(method='search')
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genres')
+    genre_mode = filters.ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')), method='skip')
+    ordering = TitleOrderingFilter(fields=ORDERING_FIELDS)
 
     class Meta:
         model = Title
-        fields = ('name', 'category', 'genre', 'year',)
+        fields = ('name', 'q', 'category', 'genre', 'genre_mode', 'year',
+                  'ordering')
+
+    def search(self, queryset, name, value):
+        """Search by name, or by name and description for ``q``.
+
+        With both parameters the first of them runs one search for the
+        two, the search joins the SQLite index table only once.
+        """
+        if self.__dict__.get('searched'):
+            return queryset
+        self.searched = True
+        terms = [
+            (self.form.cleaned_data[param], fields)
+            for param, fields in SEARCH_FIELDS.items()
+            if self.form.cleaned_data.get(param)
+        ]
+        return get_title_search().filter(queryset, terms)
+
+    def filter_category(self, queryset, name, value):
+        """Titles of the category, compared by id rather than joined by
+        slug, so the ``(category_id, field, id)`` indexes apply."""
+        category_id = Category.objects.filter(slug=value).values('id')[:1]
+        return queryset.filter(category_id=Subquery(category_id))
+
+    def filter_genres(self, queryset, name, value):
+        """Titles with any, or with ``genre_mode=all`` all, of the
+        comma-separated genre slugs."""
+        slugs = [slug for slug in value.split(',') if slug]
+        if not slugs:
+            return queryset
+        match_all = self.form.cleaned_data.get('genre_mode') == 'all'
+        return filter_by_genres(queryset, slugs, match_all)
+
+    def skip(self, queryset, name, value):
+        # genre_mode only changes how the genre filter matches.
+        return queryset
@@ -0,0 +1,73 @@
+"""Helpers shared by the bench_* management commands."""
+import math
+import os
+import socket
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reviews.models import Category, Title
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def measure(func, args_list):
+    """Call func once per args, return the timings in milliseconds."""
+    timings = []
+    for args in args_list:
+        started = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def format_timings(label, timings):
+    return (f'{label}: p50 {percentile(timings, 50):.2f} ms, '
+            f'p95 {percentile(timings, 95):.2f} ms, '
+            f'p99 {percentile(timings, 99):.2f} ms')
+
+
+def fill_titles(size, seed, stdout, genres=20):
+    """Generate titles up to size without reviews, return how many."""
+    missing = size - Title.objects.count()
+    if missing <= 0:
+        return 0
+    # Genres and categories are made once, later sizes only add titles.
+    fresh = not Category.objects.exists()
+    call_command(
+        'generate_data', users=1, titles=missing, reviews=0, comments=0,
+        genres=genres if fresh else 1, categories=20 if fresh else 1,
+        seed=seed + size, stdout=stdout)
+    return missing
+
+
+def start_gunicorn(port, worker_class='gthread', workers=2, threads=8):
+    """Start the project under gunicorn, return once it accepts requests."""
+    server = subprocess.Popen(
+        ['gunicorn', 'api_yamdb.wsgi:application',
+         '-c', os.path.join(settings.BASE_DIR, 'gunicorn.conf.py'),
+         '--bind', f'127.0.0.1:{port}',
+         '--worker-class', worker_class,
+         '--workers', str(workers),
+         '--threads', str(threads),
+         '--log-level', 'warning'],
+        cwd=settings.BASE_DIR,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+        except OSError:
+            time.sleep(0.2)
+            continue
+        # Warm every worker up before measuring.
+        time.sleep(1)
+        return server
+    server.terminate()
+    raise CommandError(f'gunicorn with {worker_class} did not start')
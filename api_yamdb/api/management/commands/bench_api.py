@@ -0,0 +1,493 @@
+import http.client
+import json
+import re
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from reviews.fake import make_name, make_words, seeded
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import CustomUser
+from users.tokens import RoleAccessToken
+
+from ._bench import percentile, start_gunicorn
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+# Route name, weight and the method of Scenario that builds the request.
+MIX = (
+    ('titles-list', 20, 'titles_list'),
+    ('titles-search', 5, 'titles_search'),
+    ('titles-detail', 10, 'titles_detail'),
+    ('reviews-list', 15, 'reviews_list'),
+    ('reviews-detail', 5, 'reviews_detail'),
+    ('comments-list', 10, 'comments_list'),
+    ('comments-detail', 3, 'comments_detail'),
+    ('categories-list', 5, 'categories_list'),
+    ('genres-list', 5, 'genres_list'),
+    ('autocomplete', 5, 'autocomplete'),
+    ('users-me', 2, 'users_me'),
+    ('users-me-update', 1, 'users_me_update'),
+    ('users-list', 1, 'users_list'),
+    ('users-detail', 1, 'users_detail'),
+    ('users-create', 1, 'users_create'),
+    ('users-update', 1, 'users_update'),
+    ('users-delete', 1, 'users_delete'),
+    ('reviews-create', 3, 'reviews_create'),
+    ('reviews-update', 2, 'reviews_update'),
+    ('reviews-delete', 1, 'reviews_delete'),
+    ('comments-create', 4, 'comments_create'),
+    ('comments-delete', 2, 'comments_delete'),
+    ('titles-create', 1, 'titles_create'),
+    ('titles-update', 1, 'titles_update'),
+    ('titles-delete', 1, 'titles_delete'),
+    ('categories-create', 1, 'categories_create'),
+    ('categories-delete', 1, 'categories_delete'),
+    ('genres-create', 1, 'genres_create'),
+    ('genres-delete', 1, 'genres_delete'),
+    ('auth-signup', 1, 'auth_signup'),
+    ('auth-token', 1, 'auth_token'),
+)
+
+
+class Scenario:
+    """Requests of one client: a user of its own plus the shared admin.
+
+    Every write is valid: reviews go to titles the client has not
+    reviewed yet, updates and deletes touch what the client created.
+    """
+
+    def __init__(self, number, data, rng, words):
+        self.number = number
+        self.data = data
+        self.rng = rng
+        self.words = words
+        self.user = data['clients'][number]
+        self.username = data['usernames'][number]
+        self.unreviewed = data['unreviewed'][number]
+        self.reviews = []
+        self.comments = []
+        self.titles = []
+        self.users = []
+        # Slugs of created categories and genres by list path.
+        self.slugs = {'/api/v1/categories/': [], '/api/v1/genres/': []}
+        self.next_title = 0
+        self.created = 0
+
+    def pick(self):
+        return self.rng.choice(self.data['reviews'])
+
+    def unique(self, prefix):
+        self.created += 1
+        return f'{prefix}-{self.number}-{self.created}-{time.time_ns()}'
+
+    def titles_list(self):
+        return 'GET', '/api/v1/titles/?limit=10', None, None
+
+    def titles_search(self):
+        term = quote(self.rng.choice(self.words))
+        return 'GET', f'/api/v1/titles/?name={term}', None, None
+
+    def titles_detail(self):
+        title_id, _ = self.pick()
+        return 'GET', f'/api/v1/titles/{title_id}/', None, None
+
+    def reviews_list(self):
+        title_id, _ = self.pick()
+        return 'GET', f'/api/v1/titles/{title_id}/reviews/', None, None
+
+    def reviews_detail(self):
+        title_id, review_id = self.pick()
+        return ('GET', f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+                None, None)
+
+    def comments_list(self):
+        title_id, review_id = self.pick()
+        return ('GET',
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+                None, None)
+
+    def comments_detail(self):
+        if not self.data['comments']:
+            return self.comments_list()
+        title_id, review_id, comment_id = self.rng.choice(
+            self.data['comments'])
+        return ('GET', f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+                       f'comments/{comment_id}/', None, None)
+
+    def categories_list(self):
+        return 'GET', '/api/v1/categories/', None, None
+
+    def genres_list(self):
+        return 'GET', '/api/v1/genres/', None, None
+
+    def autocomplete(self):
+        prefix = quote(self.rng.choice(self.words)[:self.rng.randint(1, 3)])
+        return 'GET', f'/api/v1/autocomplete/?q={prefix}', None, None
+
+    def users_me(self):
+        return 'GET', '/api/v1/users/me/', None, self.user
+
+    def users_me_update(self):
+        return ('PATCH', '/api/v1/users/me/',
+                {'bio': make_name(self.rng, self.words)}, self.user)
+
+    def users_list(self):
+        return 'GET', '/api/v1/users/', None, self.data['admin']
+
+    def users_detail(self):
+        return ('GET', f'/api/v1/users/{self.username}/', None,
+                self.data['admin'])
+
+    def users_create(self):
+        username = self.unique('user')
+        return ('POST', '/api/v1/users/',
+                {'username': username, 'email': f'{username}@yamdb.fake'},
+                self.data['admin'])
+
+    def users_update(self):
+        if not self.users:
+            return self.users_create()
+        return ('PATCH', f'/api/v1/users/{self.rng.choice(self.users)}/',
+                {'bio': make_name(self.rng, self.words)}, self.data['admin'])
+
+    def users_delete(self):
+        if not self.users:
+            return self.users_create()
+        return ('DELETE', f'/api/v1/users/{self.users.pop()}/', None,
+                self.data['admin'])
+
+    def reviews_create(self):
+        if self.next_title >= len(self.unreviewed):
+            if self.reviews:
+                return self.reviews_update()
+            return self.comments_create()
+        title_id = self.unreviewed[self.next_title]
+        self.next_title += 1
+        return ('POST', f'/api/v1/titles/{title_id}/reviews/',
+                {'text': make_name(self.rng, self.words),
+                 'score': self.rng.randint(1, 10)}, self.user)
+
+    def reviews_update(self):
+        if not self.reviews:
+            return self.reviews_create()
+        title_id, review_id = self.rng.choice(self.reviews)
+        return ('PATCH', f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+                {'score': self.rng.randint(1, 10)}, self.user)
+
+    def reviews_delete(self):
+        if not self.reviews:
+            return self.reviews_create()
+        # Only moderators and admins delete reviews.
+        title_id, review_id = self.reviews.pop()
+        return ('DELETE', f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+                None, self.data['admin'])
+
+    def comments_create(self):
+        title_id, review_id = self.pick()
+        return ('POST',
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+                {'text': make_name(self.rng, self.words)}, self.user)
+
+    def comments_delete(self):
+        if not self.comments:
+            return self.comments_create()
+        # Only moderators and admins delete comments.
+        title_id, review_id, comment_id = self.comments.pop()
+        return ('DELETE', f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+                          f'comments/{comment_id}/', None, self.data['admin'])
+
+    def titles_create(self):
+        return ('POST', '/api/v1/titles/', {
+            'name': make_name(self.rng, self.words),
+            'year': self.rng.randint(1900, 2020),
+            'description': make_name(self.rng, self.words),
+            'category': self.rng.choice(self.data['categories']),
+            'genre': self.rng.sample(
+                self.data['genres'], min(2, len(self.data['genres']))),
+        }, self.data['admin'])
+
+    def titles_delete(self):
+        if not self.titles:
+            return self.titles_create()
+        return ('DELETE', f'/api/v1/titles/{self.titles.pop()}/', None,
+                self.data['admin'])
+
+    def titles_update(self):
+        title_id, _ = self.pick()
+        return ('PATCH', f'/api/v1/titles/{title_id}/',
+                {'description': make_name(self.rng, self.words)},
+                self.data['admin'])
+
+    def categories_create(self):
+        return self.slug_create('/api/v1/categories/', 'category')
+
+    def categories_delete(self):
+        return self.slug_delete('/api/v1/categories/', 'category')
+
+    def genres_create(self):
+        return self.slug_create('/api/v1/genres/', 'genre')
+
+    def genres_delete(self):
+        return self.slug_delete('/api/v1/genres/', 'genre')
+
+    def slug_create(self, path, prefix):
+        slug = self.unique(prefix)
+        return 'POST', path, {'name': slug, 'slug': slug}, self.data['admin']
+
+    def slug_delete(self, path, prefix):
+        if not self.slugs[path]:
+            return self.slug_create(path, prefix)
+        return ('DELETE', f'{path}{self.slugs[path].pop()}/', None,
+                self.data['admin'])
+
+    def auth_signup(self):
+        username = self.unique('signup')
+        return ('POST', '/api/v1/auth/signup/',
+                {'username': username, 'email': f'{username}@yamdb.fake'},
+                None)
+
+    def auth_token(self):
+        username, code = self.data['confirmation']
+        return ('POST', '/api/v1/auth/token/',
+                {'username': username, 'confirmation_code': code}, None)
+
+    def remember(self, method, path, status, body):
+        """Keep ids of created objects for later updates and deletes."""
+        if method != 'POST' or status != 201:
+            return
+        parts = path.strip('/').split('/')
+        if path.endswith('/reviews/'):
+            self.reviews.append((int(parts[3]), body['id']))
+        elif path.endswith('/comments/'):
+            self.comments.append((int(parts[3]), int(parts[5]), body['id']))
+        elif path == '/api/v1/titles/':
+            self.titles.append(body['id'])
+        elif path == '/api/v1/users/':
+            self.users.append(body['username'])
+        elif path in self.slugs:
+            self.slugs[path].append(body['slug'])
+
+
+class Command(BaseCommand):
+    help = ('Drives every v1 route with a weighted read/write mix from '
+            'concurrent clients and reports throughput, latency and SQL '
+            'queries per route. Run it against a scratch database: it '
+            'seeds data and writes through the API.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url',
+                            help='Running server to test, by default the '
+                                 'command starts gunicorn')
+        parser.add_argument('--port', type=int, default=8766)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--clients', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--reviews-per-title', type=int, default=5,
+                            help='Average, spread by --zipf')
+        parser.add_argument('--zipf', type=float, default=1.1)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument('--save-baseline', metavar='PATH',
+                            help='Write the results to a JSON file')
+        parser.add_argument('--baseline', metavar='PATH',
+                            help='Fail on regressions against this file')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Allowed relative p95 and throughput '
+                                 'regression')
+
+    def handle(self, *args, **options):
+        rng = seeded(options['seed'])
+        words = make_words(rng, 300)
+        data = self.prepare(options)
+        server = None
+        url = options['url']
+        if url is None:
+            server = start_gunicorn(
+                options['port'], workers=options['workers'],
+                threads=options['threads'])
+            url = f'http://127.0.0.1:{options["port"]}'
+        try:
+            samples, elapsed = self.run_clients(url, data, words, options)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        results = self.summarize(samples, elapsed)
+        self.report(results)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)
+            regressions = compare(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError(
+                    'Regressions against the baseline:\n'
+                    + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS(
+                'Successfully compared with the baseline\n'))
+
+    def prepare(self, options):
+        if not Title.objects.exists():
+            self.seed(options)
+        admin, _ = CustomUser.objects.get_or_create(
+            username='bench_admin',
+            defaults={'email': 'bench_admin@yamdb.fake', 'role': 'admin'})
+        clients = []
+        usernames = []
+        unreviewed = []
+        for number in range(options['clients']):
+            user, _ = CustomUser.objects.get_or_create(
+                username=f'bench_client{number}',
+                defaults={'email': f'bench_client{number}@yamdb.fake'})
+            clients.append(f'Bearer {RoleAccessToken.for_user(user)}')
+            usernames.append(user.username)
+            unreviewed.append(list(Title.objects.exclude(
+                reviews__author=user).values_list('id', flat=True)))
+        return {
+            'admin': f'Bearer {RoleAccessToken.for_user(admin)}',
+            'clients': clients,
+            'usernames': usernames,
+            'unreviewed': unreviewed,
+            'categories': list(
+                Category.objects.values_list('slug', flat=True)),
+            'genres': list(Genre.objects.values_list('slug', flat=True)),
+            'confirmation': (
+                admin.username, default_token_generator.make_token(admin)),
+            'reviews': list(Review.objects.order_by('?').values_list(
+                'title_id', 'id')[:10000]),
+            'comments': list(Comment.objects.order_by('?').values_list(
+                'review__title_id', 'review_id', 'id')[:10000]),
+        }
+
+    def seed(self, options):
+        reviews = options['titles'] * options['reviews_per_title']
+        call_command(
+            'generate_data', users=max(options['reviews_per_title'] * 4, 10),
+            categories=options['categories'], genres=options['genres'],
+            titles=options['titles'], reviews=reviews,
+            comments=reviews * options['comments_per_review'],
+            zipf=options['zipf'], seed=options['seed'], stdout=self.stdout)
+
+    def run_clients(self, url, data, words, options):
+        stop = threading.Event()
+        samples = []
+        scenarios = [
+            Scenario(number, data, seeded(options['seed'] + number), words)
+            for number in range(options['clients'])
+        ]
+        threads = [
+            threading.Thread(target=self.client, args=(
+                url, scenario, stop, samples))
+            for scenario in scenarios
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return samples, time.perf_counter() - started
+
+    def client(self, url, scenario, stop, samples):
+        """Send requests of the mix back to back until stopped."""
+        address = urlsplit(url)
+        names = [name for name, _, _ in MIX]
+        weights = [weight for _, weight, _ in MIX]
+        builders = dict((name, builder) for name, _, builder in MIX)
+        connection = None
+        while not stop.is_set():
+            name = scenario.rng.choices(names, weights)[0]
+            method, path, body, token = getattr(scenario, builders[name])()
+            headers = {'Content-Type': 'application/json'}
+            if token is not None:
+                headers['Authorization'] = token
+            started = time.perf_counter()
+            try:
+                connection = connection or http.client.HTTPConnection(
+                    address.hostname, address.port, timeout=30)
+                connection.request(
+                    method, path, json.dumps(body) if body else None,
+                    headers)
+                response = connection.getresponse()
+                content = response.read()
+            except (OSError, http.client.HTTPException):
+                connection = None
+                samples.append((name, None, 0, None))
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            match = QUERIES.search(response.getheader('Server-Timing', ''))
+            samples.append((name, elapsed, response.status,
+                            int(match.group(1)) if match else None))
+            if response.status == 201:
+                scenario.remember(method, path, 201, json.loads(content))
+
+    def summarize(self, samples, elapsed):
+        routes = {}
+        for name, timing, status, queries in samples:
+            routes.setdefault(name, []).append((timing, status, queries))
+        results = {}
+        for name, route in sorted(routes.items()):
+            timings = [timing for timing, _, _ in route if timing is not None]
+            queries = [count for _, _, count in route if count is not None]
+            results[name] = {
+                'requests': len(route),
+                'throughput': len(route) / elapsed,
+                'errors': sum(
+                    1 for _, status, _ in route
+                    if status is None or status >= 400),
+                'p50': percentile(timings or [0], 50),
+                'p95': percentile(timings or [0], 95),
+                'p99': percentile(timings or [0], 99),
+                'queries': sum(queries) / len(queries) if queries else None,
+            }
+        return results
+
+    def report(self, results):
+        for name, result in results.items():
+            queries = result['queries']
+            self.stdout.write(
+                f'{name:18} {result["requests"]:6} req '
+                f'{result["throughput"]:7.1f} req/sec  '
+                f'p50 {result["p50"]:6.1f}  p95 {result["p95"]:6.1f}  '
+                f'p99 {result["p99"]:6.1f} ms  '
+                f'queries {queries if queries is None else f"{queries:.1f}"}'
+                f'  errors {result["errors"]}')
+
+
+def compare(results, baseline, threshold):
+    """Describe every route that got slower or chattier than the baseline."""
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        result = results.get(name)
+        if result is None:
+            regressions.append(f'{name}: not measured')
+            continue
+        if result['p95'] > base['p95'] * (1 + threshold):
+            regressions.append(
+                f'{name}: p95 {result["p95"]:.1f} ms, '
+                f'baseline {base["p95"]:.1f} ms')
+        if result['throughput'] < base['throughput'] * (1 - threshold):
+            regressions.append(
+                f'{name}: {result["throughput"]:.1f} req/sec, '
+                f'baseline {base["throughput"]:.1f} req/sec')
+        if (base['queries'] is not None and result['queries'] is not None
+                and result['queries'] > base['queries'] + 0.5):
+            regressions.append(
+                f'{name}: {result["queries"]:.1f} queries, '
+                f'baseline {base["queries"]:.1f}')
+        if result['errors'] > base['errors']:
+            regressions.append(
+                f'{name}: {result["errors"]} errors, '
+                f'baseline {base["errors"]}')
+    return regressions
@@ -0,0 +1,47 @@
+from api.permissions import IsAdmin
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import ClaimsJWTAuthentication
+from users.models import CustomUser
+from users.tokens import RoleAccessToken
+
+from ._bench import format_timings, measure
+
+
+class Command(BaseCommand):
+    help = ('Compares per-request authentication cost of plain JWT and '
+            'role-carrying tokens. Creates the bench_admin user.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        user, _ = CustomUser.objects.get_or_create(
+            username='bench_admin',
+            defaults={'email': 'bench_admin@yamdb.fake', 'role': 'admin'})
+        factory = APIRequestFactory()
+        cases = (
+            ('JWTAuthentication', JWTAuthentication, AccessToken),
+            ('ClaimsJWTAuthentication', ClaimsJWTAuthentication,
+             RoleAccessToken),
+        )
+        for label, authentication, token_class in cases:
+            header = f'Bearer {token_class.for_user(user)}'
+
+            def authenticate():
+                request = Request(factory.get(
+                    '/api/v1/users/', HTTP_AUTHORIZATION=header))
+                request.authenticators = (authentication(),)
+                assert IsAdmin().has_permission(request, None)
+
+            with CaptureQueriesContext(connection) as queries:
+                timings = measure(
+                    authenticate, [()] * options['requests'])
+            self.stdout.write(format_timings(label, timings))
+            self.stdout.write(
+                f'  {len(queries) / options["requests"]:.2f} queries/request')
@@ -0,0 +1,74 @@
+import time
+import tracemalloc
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from reviews.fake import seeded
+from reviews.models import Title
+
+from api.autocomplete import PrefixIndex
+from ._bench import format_timings, measure
+
+LIMIT = 10
+
+
+class Command(BaseCommand):
+    help = ('Measures the title name prefix index of the autocomplete '
+            'endpoint against the name__icontains filter it replaces. '
+            'Run it against a scratch database: it inserts titles.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[100000, 1000000],
+                            help='Numbers of titles to benchmark at')
+        parser.add_argument('--queries', type=int, default=2000,
+                            help='Prefix lookups per size')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = seeded(options['seed'])
+        for size in sorted(options['sizes']):
+            self.fill_titles(size, options['seed'])
+            index = PrefixIndex(Title, 'id', 'name')
+            started = time.perf_counter()
+            index.rebuild(None)
+            build = time.perf_counter() - started
+            memory = self.measure_memory()
+            names = [entry[2] for entry in rng.sample(
+                index.entries, min(options['queries'], len(index)))]
+            prefixes = [(name[:rng.randint(1, 4)],) for name in names]
+
+            def lookup(prefix):
+                index.lookup(prefix.casefold(), LIMIT)
+
+            def icontains(prefix):
+                list(Title.objects.filter(
+                    name__icontains=prefix).values('id', 'name')[:LIMIT])
+
+            self.stdout.write(
+                f'{len(index)} titles, built in {build:.2f} s, '
+                f'{memory / len(index) * 10 ** 6 / 2 ** 20:.0f} MiB '
+                f'per million names')
+            self.stdout.write(
+                format_timings('  index    ', measure(lookup, prefixes)))
+            self.stdout.write(format_timings(
+                '  icontains', measure(icontains, prefixes[:200])))
+
+    def measure_memory(self):
+        """Bytes a freshly built title index holds."""
+        tracemalloc.start()
+        try:
+            index = PrefixIndex(Title, 'id', 'name')
+            before = tracemalloc.get_traced_memory()[0]
+            index.rebuild(None)
+            return tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+
+    def fill_titles(self, size, seed):
+        missing = size - Title.objects.count()
+        if missing > 0:
+            call_command(
+                'generate_data', users=1, categories=1, genres=1,
+                titles=missing, reviews=0, comments=0, seed=seed + size,
+                stdout=self.stdout)
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from reviews.fake import seeded
+from reviews.genres import filter_by_genres
+from reviews.models import Category, Genre, Title
+
+from ._bench import fill_titles, format_timings, measure
+
+PAGE_SIZE = 10
+
+
+def joined(queryset, slugs, match_all):
+    """The filter through the links table the mask replaces."""
+    if not match_all:
+        return queryset.filter(genre__slug__in=slugs).distinct()
+    for slug in slugs:
+        queryset = queryset.filter(genre__slug=slug)
+    return queryset
+
+
+class Command(BaseCommand):
+    help = ('Compares filtering titles by several genres through the '
+            'genre mask with joins on the links table. Run it against a '
+            'scratch database: it inserts titles.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[100000, 1000000],
+                            help='Numbers of titles to benchmark at')
+        parser.add_argument('--queries', type=int, default=200,
+                            help='Filter queries per size and case')
+        parser.add_argument('--genres', type=int, default=40)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = seeded(options['seed'])
+        for size in sorted(options['sizes']):
+            fill_titles(size, options['seed'], self.stdout,
+                        genres=options['genres'])
+            slugs = list(Genre.objects.values_list('slug', flat=True))
+            categories = list(
+                Category.objects.values_list('slug', flat=True))
+            queries = [
+                (rng.sample(slugs, rng.randint(2, 3)),
+                 rng.choice(categories))
+                for _ in range(options['queries'])
+            ]
+            self.stdout.write(f'{size} titles, {len(slugs)} genres')
+            for match_all in (False, True):
+                mode = 'all' if match_all else 'any'
+                for label, apply in (('join', joined),
+                                     ('mask', filter_by_genres)):
+
+                    def run(slugs, category):
+                        queryset = apply(
+                            Title.objects.filter(category__slug=category),
+                            slugs, match_all)
+                        queryset.count()
+                        list(queryset[:PAGE_SIZE])
+
+                    self.stdout.write(format_timings(
+                        f'  {mode} {label}', measure(run, queries)))
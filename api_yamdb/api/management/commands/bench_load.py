@@ -0,0 +1,126 @@
+import http.client
+import os
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from ._bench import percentile, start_gunicorn
+
+SLOW_REQUEST = b'GET /api/v1/genres/ HTTP/1.1\r\nHost: localhost\r\n\r\n'
+
+
+def tree_rss_mb(pid):
+    """Resident memory of a process and its children, Linux only."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                ppid = int(stat.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, ()))
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total / 1024
+
+
+class Command(BaseCommand):
+    help = ('Load-tests gunicorn worker classes with the same number of '
+            'processes under fast and slow concurrent clients.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--worker-classes', nargs='+',
+                            default=['sync', 'gthread'])
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Threads per gthread worker')
+        parser.add_argument('--clients', type=int, default=16,
+                            help='Concurrent clients measuring latency')
+        parser.add_argument('--slow-clients', type=int, default=8,
+                            help='Clients sending their request slowly')
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--path', default='/api/v1/genres/')
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        for worker_class in options['worker_classes']:
+            server = start_gunicorn(
+                options['port'], worker_class, options['workers'],
+                options['threads'])
+            try:
+                rss = tree_rss_mb(server.pid)
+                timings, errors = self.load(options)
+            finally:
+                server.terminate()
+                server.wait()
+            elapsed = options['duration']
+            self.stdout.write(
+                f'{worker_class}: {len(timings) / elapsed:.0f} req/sec, '
+                f'p50 {percentile(timings or [0], 50):.1f} ms, '
+                f'p99 {percentile(timings or [0], 99):.1f} ms, '
+                f'{errors} errors, {rss:.0f} MB RSS')
+
+    def load(self, options):
+        stop = threading.Event()
+        timings = []
+        errors = []
+        address = ('127.0.0.1', options['port'])
+        threads = [
+            threading.Thread(target=self.slow_client, args=(stop, address))
+            for _ in range(options['slow_clients'])
+        ] + [
+            threading.Thread(target=self.fast_client, args=(
+                stop, address, options['path'], timings, errors))
+            for _ in range(options['clients'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return timings, len(errors)
+
+    def fast_client(self, stop, address, path, timings, errors):
+        """Send requests back to back, record their latency."""
+        connection = None
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                connection = connection or http.client.HTTPConnection(
+                    *address, timeout=30)
+                connection.request('GET', path)
+                connection.getresponse().read()
+            except (OSError, http.client.HTTPException):
+                errors.append(1)
+                connection = None
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+
+    def slow_client(self, stop, address):
+        """Trickle requests one byte at a time, holding a connection."""
+        while not stop.is_set():
+            try:
+                with socket.create_connection(address, timeout=30) as sock:
+                    for byte in SLOW_REQUEST:
+                        if stop.is_set():
+                            return
+                        sock.sendall(bytes([byte]))
+                        time.sleep(0.05)
+                    sock.recv(65536)
+            except OSError:
+                continue
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+from django.http import QueryDict
+from reviews.fake import seeded
+from reviews.models import Category, Title
+
+from api.filters import ORDERING_FIELDS, TitleFilter
+from ._bench import fill_titles, format_timings, measure
+
+PAGE_SIZE = 10
+# Created for PostgreSQL only, see reviews migration 0010.
+RAW_INDEXES = ('title_top_rated_idx', 'title_cat_top_rated_idx')
+
+
+class Command(BaseCommand):
+    help = ('Compares ordered title list pages with and without the '
+            'ordering indexes. Run it against a scratch database: it '
+            'inserts titles and overwrites their ratings.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[100000, 1000000],
+                            help='Numbers of titles to benchmark at')
+        parser.add_argument('--queries', type=int, default=100,
+                            help='Pages per size, ordering and index state')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = seeded(options['seed'])
+        for size in sorted(options['sizes']):
+            if fill_titles(size, options['seed'], self.stdout):
+                self.spread_ratings()
+            categories = list(
+                Category.objects.values_list('slug', flat=True))
+            self.stdout.write(f'{size} titles')
+            for field in ORDERING_FIELDS:
+                for ordering in (f'-{field}', field):
+                    queries = [
+                        (f'ordering={ordering}'
+                         f'&category={rng.choice(categories)}'
+                         if with_category else f'ordering={ordering}',
+                         rng.randrange(0, 1000, PAGE_SIZE))
+                        for with_category in (False, True)
+                        for _ in range(options['queries'] // 2)
+                    ]
+                    indexed = measure(self.read_page, queries)
+                    with transaction.atomic():
+                        self.drop_indexes()
+                        plain = measure(self.read_page, queries)
+                        transaction.set_rollback(True)
+                    self.stdout.write(format_timings(
+                        f'  {ordering:<14} indexed', indexed))
+                    self.stdout.write(format_timings(
+                        f'  {ordering:<14} no index', plain))
+
+    def read_page(self, query, offset):
+        queryset = TitleFilter(
+            QueryDict(query), queryset=Title.objects.all()).qs
+        list(queryset[offset:offset + PAGE_SIZE])
+
+    def drop_indexes(self):
+        names = [index.name for index in Title._meta.indexes]
+        with connection.cursor() as cursor:
+            for name in names + list(RAW_INDEXES):
+                cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+    def spread_ratings(self):
+        # Spread ratings and review counts without generating reviews,
+        # every fifth title stays unrated.
+        Title.objects.filter(review_count=0).update(
+            review_count=F('id') * 104729 % 1000 + 1,
+            rating=F('id') * 7919 % 10 + 1)
+        Title.objects.annotate(bucket=F('id') % 5).filter(bucket=0).update(
+            rating=None)
@@ -0,0 +1,70 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from reviews.fake import make_name, make_words, seeded
+from reviews.models import Category, Title
+from reviews.search import get_title_search
+
+from ._bench import format_timings, measure
+
+PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    help = ('Compares title search with the former name__contains filter. '
+            'Run it against a scratch database: it inserts titles.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[100000, 1000000],
+                            help='Numbers of titles to benchmark at')
+        parser.add_argument('--queries', type=int, default=200,
+                            help='Search queries per size')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        rng = seeded(options['seed'])
+        words = make_words(rng, 5000)
+        category, _ = Category.objects.get_or_create(
+            slug='bench', defaults={'name': 'Bench'})
+        search = get_title_search()
+        for size in sorted(options['sizes']):
+            self.fill_titles(rng, words, category, size, options['batch_size'])
+            terms = [
+                (word[:rng.randint(3, len(word))],)
+                for word in rng.sample(words, options['queries'])
+            ]
+
+            def contains(term):
+                queryset = Title.objects.filter(name__contains=term)
+                queryset.count()
+                list(queryset[:PAGE_SIZE])
+
+            def indexed(term):
+                queryset = search.filter(
+                    Title.objects.all(), [(term, ('name',))])
+                queryset.count()
+                list(queryset[:PAGE_SIZE])
+
+            self.stdout.write(f'{size} titles, {type(search).__name__}')
+            self.stdout.write(
+                format_timings('  contains', measure(contains, terms)))
+            self.stdout.write(
+                format_timings('  search  ', measure(indexed, terms)))
+
+    def fill_titles(self, rng, words, category, size, batch_size):
+        missing = size - Title.objects.count()
+        if missing <= 0:
+            return
+        titles = (
+            Title(name=make_name(rng, words), year=rng.randint(1900, 2022),
+                  description=make_name(rng, words), category=category)
+            for _ in range(missing)
+        )
+        while True:
+            batch = list(islice(titles, batch_size))
+            if not batch:
+                break
+            Title.objects.bulk_create(batch)
+        get_title_search().rebuild()
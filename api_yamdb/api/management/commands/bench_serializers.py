@@ -0,0 +1,111 @@
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from reviews.fake import make_name, make_words, seeded
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import CustomUser
+
+from api.compiled import compile_serializer
+from api.serializers import (
+    CommentSerializer, GenreSerializer, ReviewSerializer, TitleSerializer,
+    requested_fields)
+
+
+class Command(BaseCommand):
+    help = ('Compares rows/sec of the DRF serializers and their compiled '
+            'read path, queries included. Run it against a scratch '
+            'database: it inserts bench data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000,
+                            help='Rows per serialized page')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        title, review = self.fill(seeded(options['seed']), rows)
+        cases = (
+            ('Title', TitleSerializer, Title.objects.select_related(
+                'category').prefetch_related('genre').order_by('id'), {}),
+            ('Title ?fields=id,name', TitleSerializer,
+             Title.objects.only('id', 'name').order_by('id'),
+             {'fields': 'id,name'}),
+            ('Genre', GenreSerializer, Genre.objects.order_by('id'), {}),
+            ('Review', ReviewSerializer, Review.objects.filter(
+                title=title).select_related('author'), {}),
+            ('Comment', CommentSerializer, Comment.objects.filter(
+                review=review).select_related('author'), {}),
+        )
+        for label, serializer_class, queryset, params in cases:
+            request = Request(APIRequestFactory().get('/', params))
+            field_names = None
+            if params:
+                field_names = tuple(
+                    requested_fields(request, serializer_class.Meta.fields))
+            compiled = compile_serializer(serializer_class, field_names)
+
+            def drf():
+                return serializer_class(
+                    queryset[:rows], many=True,
+                    context={'request': request}).data
+
+            def fast():
+                return compiled.serialize(compiled.values(queryset)[:rows])
+
+            assert [dict(item) for item in drf()] == fast()
+            count = len(fast())
+            repeat = options['repeat']
+            self.stdout.write(
+                f'{label}: {count} rows, '
+                f'DRF {self.rate(drf, count, repeat):.0f} rows/sec, '
+                f'compiled {self.rate(fast, count, repeat):.0f} rows/sec')
+
+    def rate(self, func, count, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return count * repeat / (time.perf_counter() - started)
+
+    def fill(self, rng, rows):
+        words = make_words(rng, 500)
+        category, _ = Category.objects.get_or_create(
+            slug='bench', defaults={'name': 'Bench'})
+        genres = [
+            Genre.objects.get_or_create(
+                slug=f'bench-{i}', defaults={'name': make_name(rng, words)})[0]
+            for i in range(3)
+        ]
+        missing = rows - Title.objects.count()
+        if missing > 0:
+            Title.objects.bulk_create(
+                Title(name=make_name(rng, words), year=2000,
+                      description=make_name(rng, words), category=category)
+                for _ in range(missing))
+        titles = Title.objects.filter(genre=None).values_list('id', flat=True)
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title_id, genre=genre)
+            for title_id in titles for genre in rng.sample(genres, 2))
+        users = list(islice(CustomUser.objects.filter(
+            username__startswith='bench_reader'), rows))
+        if len(users) < rows:
+            CustomUser.objects.bulk_create(
+                CustomUser(username=f'bench_reader{i}',
+                           email=f'bench_reader{i}@yamdb.fake')
+                for i in range(len(users), rows))
+            users = list(CustomUser.objects.filter(
+                username__startswith='bench_reader')[:rows])
+        title = Title.objects.order_by('id').first()
+        reviewed = set(title.reviews.values_list('author_id', flat=True))
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text=make_name(rng, words),
+                   score=rng.randint(1, 10))
+            for user in users if user.id not in reviewed)
+        review = title.reviews.order_by('id').first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text=make_name(rng, words))
+            for user in users[Comment.objects.filter(review=review).count():])
+        return title, review
@@ -0,0 +1,100 @@
+import os
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    generate_latest, multiprocess)
+
+LABELS = ('view', 'action')
+
+REQUESTS = Counter(
+    'yamdb_requests', 'Handled requests', LABELS + ('status',))
+REQUEST_SECONDS = Histogram(
+    'yamdb_request_duration_seconds', 'Wall time of a request', LABELS)
+DB_SECONDS = Histogram(
+    'yamdb_request_db_seconds', 'Time spent in SQL per request', LABELS)
+QUERIES = Histogram(
+    'yamdb_request_queries', 'SQL queries per request', LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf')))
+SERIALIZE_SECONDS = Histogram(
+    'yamdb_request_serialize_seconds',
+    'Time spent building and rendering response data', LABELS)
+RESPONSE_BYTES = Histogram(
+    'yamdb_response_size_bytes', 'Size of the response body', LABELS,
+    buckets=tuple(4 ** power for power in range(4, 13)) + (float('inf'),))
+
+
+class RequestStats:
+    """Numbers collected while one request is handled."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = 'unresolved'
+        self.action = ''
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+
+    def count_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += time.perf_counter() - started
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def observe(self, status, size):
+        labels = (self.view, self.action)
+        REQUESTS.labels(*labels, str(status)).inc()
+        REQUEST_SECONDS.labels(*labels).observe(self.elapsed())
+        DB_SECONDS.labels(*labels).observe(self.db)
+        QUERIES.labels(*labels).observe(self.queries)
+        SERIALIZE_SECONDS.labels(*labels).observe(self.serialize)
+        RESPONSE_BYTES.labels(*labels).observe(size)
+
+    def server_timing(self):
+        return (f'total;dur={self.elapsed() * 1000:.1f}, '
+                f'db;dur={self.db * 1000:.1f};desc="{self.queries} queries", '
+                f'serialize;dur={self.serialize * 1000:.1f}')
+
+
+@contextmanager
+def observe_queries(stats):
+    """Count the queries of every database connection into the stats."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(
+                connection.execute_wrapper(stats.count_query))
+        yield
+
+
+@contextmanager
+def measure_serialization(request):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = getattr(request, 'stats', None)
+        if stats is not None:
+            stats.serialize += time.perf_counter() - started
+
+
+def metrics_view(request):
+    """Metrics of all workers in the Prometheus text format.
+
+    Under gunicorn every worker writes its numbers to files in
+    ``PROMETHEUS_MULTIPROC_DIR``, which are summed up here.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,100 @@
+import cProfile
+import os
+import pstats
+import time
+
+from rest_framework.exceptions import APIException
+from users.authentication import ClaimsJWTAuthentication
+
+from .metrics import RequestStats, observe_queries
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_LIMIT = 20
+
+
+def is_admin_request(request):
+    try:
+        result = ClaimsJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return result is not None and result[0].is_admin
+
+
+def profile_summary(profiler):
+    """Top functions by cumulative time as a one-line header value."""
+    stats = pstats.Stats(profiler).stats
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return '; '.join(
+        f'{cumtime * 1000:.1f}ms {calls} '
+        f'{os.path.basename(filename)}:{line}({name})'
+        for (filename, line, name), (_, calls, _, cumtime, _)
+        in top[:PROFILE_LIMIT]
+    )
+
+
+class MetricsMiddleware:
+    """Measure every request by the view and action that handled it.
+
+    Wall time, SQL queries and their time, serialization time and the body
+    size go to the Prometheus histograms and the ``Server-Timing`` header.
+    Admins may send ``X-Profile: 1`` to get a cProfile summary of the
+    request in the ``X-Profile`` response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = request.stats = RequestStats()
+        profiler = None
+        if (request.META.get(PROFILE_HEADER) == '1'
+                and is_admin_request(request)):
+            profiler = cProfile.Profile()
+        with observe_queries(stats):
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        response['Server-Timing'] = stats.server_timing()
+        if profiler is not None:
+            response['X-Profile'] = profile_summary(profiler)
+        if response.streaming:
+            response.streaming_content = self.observe_stream(
+                stats, response.status_code, response.streaming_content)
+        else:
+            stats.observe(response.status_code, len(response.content))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = request.stats
+        method = request.method.lower()
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None:
+            stats.view = getattr(view_func, '__name__', 'view')
+            stats.action = method
+            return
+        stats.view = view_class.__name__
+        actions = getattr(view_func, 'actions', None) or {}
+        stats.action = actions.get(method, method)
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+
+        def measure_render(response):
+            request.stats.serialize += time.perf_counter() - started
+
+        response.add_post_render_callback(measure_render)
+        return response
+
+    def observe_stream(self, stats, status, content):
+        size = 0
+        try:
+            with observe_queries(stats):
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            stats.observe(status, size)
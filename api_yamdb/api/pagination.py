@@ -0,0 +1,160 @@
+import base64
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .counts import approximate_count
+
+
+class ApproximateCountPagination(LimitOffsetPagination):
+    """Limit/offset pagination that avoids an exact COUNT(*) per request.
+
+    Views with a ``get_stored_count()`` method give the ``count`` from a
+    stored counter, other lists are counted with ``approximate_count``.
+    ``?count=false`` skips the count: ``count`` is null and one extra row
+    tells whether there is a next page.
+    """
+
+    count_query_param = 'count'
+    view = None
+
+    def wants_count(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() not in ('false', '0')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        if self.wants_count(request):
+            return super().paginate_queryset(queryset, request, view)
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = None
+        self.offset = self.get_offset(request)
+        self.request = request
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        return page[:self.limit]
+
+    def count_rows(self, queryset, request):
+        """Set what the links need without reading the page."""
+        if self.wants_count(request):
+            self.count = self.get_count(queryset)
+            return
+        self.count = None
+        end = self.offset + self.limit
+        self.has_next = queryset[end:end + 1].exists()
+
+    def get_count(self, queryset):
+        stored_count = getattr(self.view, 'get_stored_count', None)
+        if stored_count is not None:
+            return stored_count()
+        return approximate_count(queryset)
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit)
+
+
+class PubDatePagination(ApproximateCountPagination):
+    """Limit/offset pagination with an opt-in keyset mode.
+
+    A request with the ``cursor`` parameter (empty for the first page)
+    seeks on (pub_date, id) instead of skipping ``offset`` rows and does
+    not count the rows, so every page costs the same.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        position, reverse = self.decode_cursor(request)
+        if reverse:
+            queryset = queryset.order_by('pub_date', 'id')
+        else:
+            queryset = queryset.order_by('-pub_date', '-id')
+        if position is not None:
+            pub_date, pk = position
+            if reverse:
+                queryset = queryset.filter(pub_date__gte=pub_date).filter(
+                    Q(pub_date__gt=pub_date) | Q(id__gt=pk))
+            else:
+                queryset = queryset.filter(pub_date__lte=pub_date).filter(
+                    Q(pub_date__lt=pub_date) | Q(id__lt=pk))
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        if isinstance(obj, dict):
+            pub_date, pk = obj['pub_date'], obj['id']
+        else:
+            pub_date, pk = obj.pub_date, obj.pk
+        position = f'{int(reverse)}|{pub_date.isoformat()}|{pk}'
+        cursor = base64.urlsafe_b64encode(position.encode()).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """Return ((pub_date, id), reverse) of the cursor in the request."""
+        cursor = request.query_params[self.cursor_query_param]
+        if not cursor:
+            return None, False
+        try:
+            reverse, pub_date, pk = base64.urlsafe_b64decode(
+                cursor.encode()).decode().split('|')
+            position = (parse_datetime(pub_date), int(pk))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse == '1'
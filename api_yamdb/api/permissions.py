@@ -19,7 +19,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
                 or request.method in permissions.SAFE_METHODS)
 
     def has_object_permission(self, request, view, obj):
-        if obj.author != request.user:
+        if obj.author_id != request.user.id:
             if request.method in ['PUT', 'PATCH']:
                 raise PermissionDenied(ERROR_MESSAGES['update_denied'])
             if request.method in ['DELETE']:
@@ -34,7 +34,7 @@ class IsModerator(permissions.BasePermission):
         return False
 
     def has_object_permission(self, request, view, obj):
-        if obj.author != request.user:
+        if obj.author_id != request.user.id:
             if request.method in ['PUT', 'PATCH']:
                 raise PermissionDenied(ERROR_MESSAGES['update_denied'])
         return True
@@ -55,7 +55,7 @@ class IsAdminOrModerator(permissions.BasePermission):
         return False
 
     def has_object_permission(self, request, view, obj):
-        if obj.author != request.user and request.user.is_moderator:
+        if obj.author_id != request.user.id and request.user.is_moderator:
             if request.method in ['PUT', 'PATCH']:
                 raise PermissionDenied(ERROR_MESSAGES['update_denied'])
         return True
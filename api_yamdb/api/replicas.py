@@ -0,0 +1,83 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+# Reads go to the primary unless a request allowed replicas, so
+# management commands, the task worker and writes see their own data.
+use_replica = ContextVar('use_replica', default=False)
+
+
+class ReplicaRouter:
+    """Send reads to a random replica while the request allows it."""
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and use_replica.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema through replication.
+        return db not in settings.DATABASE_REPLICAS
+
+
+def is_sticky(request):
+    """Whether the client wrote recently enough to read from the primary."""
+    try:
+        until = float(request.COOKIES[settings.REPLICA_STICKY_COOKIE])
+    except (KeyError, ValueError):
+        return False
+    return until > time.time()
+
+
+class ReplicaMiddleware:
+    """Allow replica reads for safe requests of views that accept them.
+
+    A successful unsafe request sets a cookie that keeps the reads of the
+    client on the primary for ``REPLICA_STICKY_SECONDS``, so it sees its
+    own writes despite replication lag. Views opt out with
+    ``use_replica = False``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        allowed = request.method in SAFE_METHODS and not is_sticky(request)
+        token = use_replica.set(allowed)
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        if response.streaming:
+            response.streaming_content = self.stream(
+                allowed and getattr(request, 'use_replica', True),
+                response.streaming_content)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            window = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE, str(time.time() + window),
+                max_age=window, httponly=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'cls', view_func)
+        request.use_replica = getattr(view, 'use_replica', True)
+        if not request.use_replica:
+            use_replica.set(False)
+
+    def stream(self, allowed, content):
+        # The body of a streamed response is read after __call__ returned.
+        token = use_replica.set(allowed)
+        try:
+            yield from content
+        finally:
+            use_replica.reset(token)
@@ -2,7 +2,6 @@ from datetime import datetime
 
 from django.contrib.auth.tokens import default_token_generator
 from django.core.validators import RegexValidator
-from django.db.models import Avg
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
@@ -13,7 +12,7 @@ from users.models import CustomUser
 
 class CategorySerializer(serializers.ModelSerializer):
     slug = serializers.SlugField(validators=[
-        UniqueValidator(queryset=Category.objects.all()),
+        UniqueValidator(queryset=Category.all_objects.all()),
         RegexValidator(regex='^[-a-zA-Z0-9_]+$')
     ])
 
@@ -24,7 +23,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class GenreSerializer(serializers.ModelSerializer):
     slug = serializers.SlugField(validators=[
-        UniqueValidator(queryset=Genre.objects.all()),
+        UniqueValidator(queryset=Genre.all_objects.all()),
         RegexValidator(regex='^[-a-zA-Z0-9_]+$')
     ])
 
@@ -33,22 +32,49 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleSerializer(serializers.ModelSerializer):
+def requested_fields(request, names):
+    """Names the ``fields`` and ``omit`` query parameters keep, in order.
+
+    Both take comma-separated field names, ``fields`` keeps only the
+    listed ones and ``omit`` drops them.
+    """
+    kept = list(names)
+    for param, keep in (('fields', True), ('omit', False)):
+        if param not in request.query_params:
+            continue
+        chosen = {
+            name for name in request.query_params[param].split(',') if name}
+        unknown = chosen.difference(names)
+        if unknown:
+            raise serializers.ValidationError(
+                {param: [f'Неизвестные поля: {", ".join(sorted(unknown))}']})
+        kept = [name for name in kept if (name in chosen) == keep]
+    return kept
+
+
+class SparseFieldsMixin:
+    """Render only the fields the request asks for."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+        kept = requested_fields(request, list(self.fields))
+        for name in list(self.fields):
+            if name not in kept:
+                del self.fields[name]
+
+
+class TitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
-    rating = serializers.SerializerMethodField(read_only=True, )
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
                   'description', 'genre', 'category')
 
-    def get_rating(self, title):
-        rating = Review.objects.filter(title=title).aggregate(Avg('score'))
-        if rating.get('score__avg') is None:
-            return None
-        return int(rating.get('score__avg'))
-
 
 class CreateUpdateTitleSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
@@ -65,7 +91,7 @@ class CreateUpdateTitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
                   'description', 'genre', 'category')
 
     def validate_year(self, value):
@@ -84,15 +110,16 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
 
     def validate(self, data):
-        title_id = (
-            self.context["request"].parser_context["kwargs"].get("title_id"))
         author = self.context["request"].user
-        current_title = get_object_or_404(Title, id=title_id)
+        current_title = self.context["view"].get_title()
+        # A deleted review keeps its place until the worker purges it.
         if self.context["request"].method == "POST" and (
-           current_title.reviews.filter(author=author).exists()):
+           Review.all_objects.filter(
+               title=current_title, author=author).exists()):
             raise serializers.ValidationError(
                 "Review on this title already exists.")
         return data
@@ -108,22 +135,38 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
+# Deleted users give up their names and addresses, all_objects still
+# sees their placeholders, see SoftDeleteModel.released_fields.
+UNIQUE_USER_FIELDS = {
+    name: {'validators': [
+        UniqueValidator(queryset=CustomUser.all_objects.all())]}
+    for name in ('username', 'email')
+}
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('username', 'email', 'first_name',
                   'last_name', 'bio', 'role')
+        extra_kwargs = UNIQUE_USER_FIELDS
 
     def update(self, instance, validated_data):
         if validated_data.get('role') is not None:
             validated_data.pop('role')
-        return super().update(instance, validated_data)
+        # Only the sent fields are written, so a change made to the row
+        # in the meantime, such as a new role, is kept.
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
 
 
 class CreateCustomUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('username', 'email',)
+        extra_kwargs = UNIQUE_USER_FIELDS
 
     def validate(self, data):
         if data['username'] == 'me':
@@ -162,3 +205,8 @@ class TokenSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({
                 'confirmation_code': ['Invalid value']})
         return data
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import CustomUser
+
+from .autocomplete import autocomplete
+from .cache import bump_version
+
+# Models whose version in the cache keys cached lists and counts.
+VERSIONED_MODELS = (
+    Category, Genre, Title, GenreTitle, Review, Comment, CustomUser)
+
+
+# Versions move once the change is committed, so other processes never
+# cache a list read before the commit under the new version.
+def invalidate_on_save(sender, instance, using, **kwargs):
+    transaction.on_commit(
+        lambda: autocomplete.apply(instance, bump_version(sender)),
+        using=using)
+
+
+def invalidate_on_delete(sender, instance, using, **kwargs):
+    transaction.on_commit(
+        lambda: autocomplete.apply(
+            instance, bump_version(sender), deleted=True),
+        using=using)
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(invalidate_on_save, sender=model)
+    post_delete.connect(invalidate_on_delete, sender=model)
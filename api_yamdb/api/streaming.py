@@ -0,0 +1,89 @@
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .compiled import CompiledListMixin
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data):
+    """Encode like DRF's JSONRenderer: compact, UTF-8, no ASCII escapes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=JSONEncoder().default)
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':'),
+    ).encode()
+
+
+def chunks(queryset, size):
+    """Yield lists of objects, prefetching related objects per list.
+
+    ``iterator()`` skips ``prefetch_related()``, so the lookups are applied
+    to every chunk by hand.
+    """
+    lookups = queryset._prefetch_related_lookups
+    objects = queryset.iterator(chunk_size=size)
+    while True:
+        chunk = list(islice(objects, size))
+        if not chunk:
+            return
+        if lookups:
+            prefetch_related_objects(chunk, *lookups)
+        yield chunk
+
+
+class StreamingListMixin(CompiledListMixin):
+    """Stream large limit/offset pages instead of building them in memory.
+
+    Pages of at least ``STREAMING_LIST_THRESHOLD`` rows are read from the
+    database, serialized and encoded ``STREAMING_CHUNK_SIZE`` rows at a
+    time. The body keeps the envelope of the paginator.
+    """
+
+    def should_stream(self, request):
+        paginator = self.paginator
+        if paginator is None or not hasattr(paginator, 'count_rows'):
+            return False
+        if getattr(paginator, 'cursor_query_param', None) in (
+                request.query_params):
+            return False
+        limit = paginator.get_limit(request)
+        return limit is not None and limit >= settings.STREAMING_LIST_THRESHOLD
+
+    def list(self, request, *args, **kwargs):
+        if not self.should_stream(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_list_queryset()
+        paginator = self.paginator
+        paginator.request = request
+        paginator.view = self
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+        paginator.count_rows(queryset, request)
+        page = queryset[paginator.offset:paginator.offset + paginator.limit]
+        return StreamingHttpResponse(
+            self.stream_page(page, paginator),
+            content_type='application/json',
+        )
+
+    def stream_page(self, page, paginator):
+        yield b''.join((
+            b'{"count":', dumps(paginator.count),
+            b',"next":', dumps(paginator.get_next_link()),
+            b',"previous":', dumps(paginator.get_previous_link()),
+            b',"results":[',
+        ))
+        separator = b''
+        for chunk in chunks(page, settings.STREAMING_CHUNK_SIZE):
+            data = self.serialize_list(chunk)
+            yield separator + b','.join(dumps(item) for item in data)
+            separator = b','
+        yield b']}'
@@ -23,5 +23,7 @@ urlpatterns = [
          name='token_obtain_pair'),
     path('v1/auth/signup/', views.EmailConfirmationViewSet.as_view(),
          name='regist_user_conf_email'),
+    path('v1/autocomplete/', views.AutocompleteView.as_view(),
+         name='autocomplete'),
     path('v1/', include(router.urls)),
 ]
@@ -1,23 +1,29 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.generics import GenericAPIView
 from rest_framework.mixins import CreateModelMixin
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.views import APIView
 from reviews.models import Category, Comment, Genre, Review, Title
+from tasks.queue import enqueue
 from users.models import CustomUser
+from users.tokens import RoleAccessToken
 
+from .autocomplete import autocomplete
+from .cache import CachedListMixin, ConditionalGetMixin
+from .compiled import CompiledListMixin
 from .filters import TitleFilter
+from .pagination import ApproximateCountPagination, PubDatePagination
 from .permissions import (
     IsAdmin, IsAdminOrModerator, IsOwnerOrReadOnly, ReadOnly)
 from .serializers import (
+    AutocompleteQuerySerializer,
     CategorySerializer,
     CommentSerializer,
     CreateCustomUserSerializer,
@@ -27,17 +33,29 @@ from .serializers import (
     TitleSerializer,
     TokenSerializer,
     UserSerializer,
+    requested_fields,
 )
+from .streaming import StreamingListMixin
+
+
+class SoftDeleteMixin:
+    """Answer destroy right away, the worker purges the object later."""
+
+    def perform_destroy(self, instance):
+        instance.soft_delete()
 
 
 class BaseViewSet(
+    SoftDeleteMixin,
+    CachedListMixin,
+    CompiledListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
     permission_classes = (IsAdmin,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = ApproximateCountPagination
     filter_backends = (filters.SearchFilter,)
 
     def get_permissions(self):
@@ -46,10 +64,45 @@ class BaseViewSet(
         return super().get_permissions()
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class NestedParentsMixin:
+    """Resolve the title and review of a nested route once per request.
+
+    The review is loaded together with its title and must belong to the
+    title from the URL. Loaded objects are kept on the request, so
+    serializers and permissions get them through the view for free.
+    """
+
+    def get_parents(self):
+        if not hasattr(self.request, "parents"):
+            self.request.parents = {}
+        return self.request.parents
+
+    def get_title(self):
+        if "review_id" in self.kwargs:
+            return self.get_review().title
+        parents = self.get_parents()
+        if "title" not in parents:
+            parents["title"] = get_object_or_404(
+                Title, pk=self.kwargs.get("title_id"))
+        return parents["title"]
+
+    def get_review(self):
+        parents = self.get_parents()
+        if "review" not in parents:
+            parents["review"] = get_object_or_404(
+                Review.objects.select_related("title"),
+                pk=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+                title__deleted_at__isnull=True,
+            )
+        return parents["review"]
+
+
+class ReviewViewSet(NestedParentsMixin, ConditionalGetMixin, SoftDeleteMixin,
+                    StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (IsOwnerOrReadOnly,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDatePagination
 
     def get_permissions(self):
         if self.action == "destroy":
@@ -57,18 +110,23 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return Review.objects.filter(title=title)
+        return Review.objects.filter(
+            title=self.get_title()).select_related("author")
+
+    def get_stored_count(self):
+        return self.get_title().review_count
+
+    def get_versioned_title(self, cheap):
+        return self.get_title()
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all()
+class CommentViewSet(NestedParentsMixin, ConditionalGetMixin,
+                     StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = PubDatePagination
     permission_classes = (IsOwnerOrReadOnly,)
 
     def get_permissions(self):
@@ -77,12 +135,17 @@ class CommentViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        return Comment.objects.filter(review=review)
+        return Comment.objects.filter(
+            review=self.get_review()).select_related("author")
+
+    def get_stored_count(self):
+        return self.get_review().comment_count
+
+    def get_versioned_title(self, cheap):
+        return self.get_review().title
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
 
 class CategoryViewSet(BaseViewSet):
@@ -99,12 +162,19 @@ class GenreViewSet(BaseViewSet):
     search_fields = ("name",)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, SoftDeleteMixin, StreamingListMixin,
+                   viewsets.ModelViewSet):
+    """Titles; reads take ``?fields=`` and ``?omit=`` to prune fields.
+
+    Pruned relations are neither joined nor prefetched, pruned columns
+    are not loaded.
+    """
+
     queryset = Title.objects.all()
     lookup_field = "id"
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
-    pagination_class = LimitOffsetPagination
+    pagination_class = ApproximateCountPagination
     permission_classes = (IsAdmin,)
 
     def get_permissions(self):
@@ -117,8 +187,45 @@ class TitleViewSet(viewsets.ModelViewSet):
             return CreateUpdateTitleSerializer
         return TitleSerializer
 
+    def get_field_names(self):
+        if self.action not in ("list", "retrieve"):
+            return None
+        return tuple(
+            requested_fields(self.request, TitleSerializer.Meta.fields))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        names = self.get_field_names()
+        if names is None:
+            names = TitleSerializer.Meta.fields
+        else:
+            queryset = queryset.only(
+                "id", "version", "modified_at",
+                *(name for name in names if name != "genre"))
+        if "category" in names:
+            queryset = queryset.select_related("category")
+        if "genre" in names:
+            queryset = queryset.prefetch_related("genre")
+        return queryset
+
+    def get_object(self):
+        # Loaded once for the validators and the response.
+        if not hasattr(self, "object"):
+            self.object = super().get_object()
+        return self.object
 
-class UsersViewSet(viewsets.ModelViewSet):
+    def get_versioned_title(self, cheap):
+        if self.action != "retrieve":
+            return None
+        if cheap:
+            return Title.objects.only("version", "modified_at").filter(
+                pk=self.kwargs["id"]).first()
+        return self.get_object()
+
+
+class UsersViewSet(SoftDeleteMixin, viewsets.ModelViewSet):
+    # Roles and profiles are edited and read back right away.
+    use_replica = False
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     lookup_field = "username"
@@ -145,23 +252,41 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status.HTTP_200_OK)
 
 
+class AutocompleteView(APIView):
+    """Titles, genres, categories and, for admins, users by name prefix.
+
+    Served from the in-memory prefix indexes, without a database query.
+    """
+
+    def get(self, request):
+        query = AutocompleteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        sections = ['titles', 'genres', 'categories']
+        if IsAdmin().has_permission(request, self):
+            sections.append('users')
+        return Response(autocomplete.lookup(
+            query.validated_data['q'], sections,
+            query.validated_data['limit']))
+
+
 class EmailConfirmationViewSet(CreateModelMixin, GenericAPIView):
     serializer_class = CreateCustomUserSerializer
 
     def post(self, request):
         serializer = CreateCustomUserSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        user = get_object_or_404(
-            CustomUser, username=serializer.validated_data.get("username")
-        )
-        confirmation_code = default_token_generator.make_token(user)
-        send_mail(
-            "Hello",
-            f"This is your confirmation code: {confirmation_code}",
-            settings.EMAIL_FROM,
-            [serializer.validated_data.get("email")],
-        )
+        # The mail is sent by the worker, the task is committed together
+        # with the user it belongs to.
+        with transaction.atomic():
+            user = serializer.save()
+            confirmation_code = default_token_generator.make_token(user)
+            enqueue(
+                "send_mail",
+                subject="Hello",
+                message=f"This is your confirmation code: {confirmation_code}",
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+            )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -174,5 +299,5 @@ class TokenViewAPI(GenericAPIView):
         user = get_object_or_404(
             CustomUser, username=serializer.validated_data["username"]
         )
-        token = AccessToken.for_user(user)
+        token = RoleAccessToken.for_user(user)
         return Response({"token": str(token)}, status=status.HTTP_201_CREATED)
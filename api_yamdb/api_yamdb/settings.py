@@ -7,7 +7,7 @@ load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-SECRET_KEY = os.getenv('SECRET_KEY', default='secret_django_key'),
+SECRET_KEY = os.getenv('SECRET_KEY', default='secret_django_key')
 
 DEBUG = False
 
@@ -24,11 +24,14 @@ INSTALLED_APPS = [
     'api.apps.ApiConfig',
     'reviews.apps.ReviewsConfig',
     'users.apps.UsersConfig',
+    'tasks.apps.TasksConfig',
     'rest_framework',
     'django_filters'
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,8 +75,32 @@ DATABASES = {
     }
 }
 
+# Read replicas of the default database: DB_REPLICA_HOSTS=host1,host2
+DATABASE_REPLICAS = []
+for number, host in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1):
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+# Reads of a client stay on the primary this long after it wrote.
+REPLICA_STICKY_SECONDS = 10
+REPLICA_STICKY_COOKIE = 'primary_until'
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
+# Cache
+
+# Shared by the gunicorn workers and the task worker: list versions,
+# cached counts and throttling have to agree between processes.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.memcached.MemcachedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='memcached:11211'),
+    }
+}
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -125,13 +152,29 @@ EMAIL_USE_TLS = True
 EMAIL_PORT = 587
 EMAIL_HOST_USER = os.getenv('EMAIL')
 EMAIL_HOST_PASSWORD = os.getenv('PWD')
+DEFAULT_FROM_EMAIL = os.getenv('EMAIL_FROM', default='YaMDB@yandex.ru')
+
+# Background tasks
+
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_DELAY = 30
+TASKS_LOCK_TIMEOUT = 600
+
+# Unfiltered lists of tables with at least this many rows report the
+# PostgreSQL planner estimate as their count.
+COUNT_ESTIMATE_THRESHOLD = 100000
+# Seconds an exact count of a filtered list is cached for.
+COUNT_CACHE_TTL = 30
+
+# Rows deleted per transaction when soft-deleted objects are purged
+PURGE_CHUNK_SIZE = 500
 
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -145,3 +188,18 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# List pages are built from values() rows instead of model instances.
+COMPILED_SERIALIZERS = True
+
+# List pages of this many rows or more are streamed in chunks.
+STREAMING_LIST_THRESHOLD = 1000
+STREAMING_CHUNK_SIZE = 500
+
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60
+
+# Seconds the autocomplete indexes may lag behind changes made by other
+# processes, and the age after which they are rebuilt anyway.
+AUTOCOMPLETE_REFRESH = 10
+AUTOCOMPLETE_MAX_AGE = 600
@@ -0,0 +1,24 @@
+from .settings import *  # noqa: F401, F403
+
+# API tests run against an in-memory SQLite database, the PostgreSQL
+# configuration of the project itself is checked in tests/test_settings.py.
+# The same goes for memcached, replaced with the local-memory cache.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+    # Routing tests turn it on with DATABASE_REPLICAS = ['replica'].
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_REPLICAS = []
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb',
+    }
+}
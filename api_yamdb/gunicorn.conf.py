@@ -0,0 +1,36 @@
+import multiprocessing
+import os
+import shutil
+
+bind = '0:8000'
+# Threads let a worker serve other requests while one waits on the
+# database or a slow client; GUNICORN_WORKER_CLASS=sync restores the
+# one-request-per-process model.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS', multiprocessing.cpu_count() + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+
+def on_starting(server):
+    # Metrics files of the previous run would be summed with the new ones.
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Build the autocomplete indexes before the first search box asks.
+    from api.autocomplete import autocomplete
+    from django.db import connections
+
+    autocomplete.refresh(autocomplete.indexes)
+    connections.close_all()
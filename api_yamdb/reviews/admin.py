@@ -1,10 +1,14 @@
+from api.counts import ApproximateCountPaginator
 from django.contrib import admin
 
 from .models import Category, Comment, Genre, GenreTitle, Review, Title
 
-admin.site.register(Category)
-admin.site.register(Genre)
-admin.site.register(Title)
-admin.site.register(Review)
-admin.site.register(Comment)
-admin.site.register(GenreTitle)
+
+class ApproximateCountAdmin(admin.ModelAdmin):
+    # The changelist counts once, through the cached or estimated count.
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+
+for model in (Category, Genre, Title, Review, Comment, GenreTitle):
+    admin.site.register(model, ApproximateCountAdmin)
@@ -0,0 +1,53 @@
+from io import StringIO
+
+from django.core.management.color import no_style
+from django.db import connection
+
+
+def copy_value(value):
+    """Format a value for PostgreSQL COPY in text format."""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def insert_objects(model, objs, use_copy=False):
+    """Insert instances with their primary keys and field values as is.
+
+    Unlike bulk_create() no pre_save() runs, so pub_date of reviews and
+    comments keeps the given value instead of the current time.
+    """
+    if not objs:
+        return
+    fields = model._meta.concrete_fields
+    rows = [
+        [field.get_db_prep_save(getattr(obj, field.attname), connection)
+         for field in fields]
+        for obj in objs
+    ]
+    table = connection.ops.quote_name(model._meta.db_table)
+    names = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        if use_copy:
+            buffer = StringIO()
+            for row in rows:
+                buffer.write('\t'.join(copy_value(value) for value in row))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {table} ({names}) FROM STDIN', buffer)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(
+                f'INSERT INTO {table} ({names}) VALUES ({placeholders})',
+                rows)
+
+
+def reset_sequences(models):
+    """Move PostgreSQL id sequences past explicitly inserted ids."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
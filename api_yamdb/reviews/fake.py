@@ -0,0 +1,22 @@
+"""Made-up words and names for generated data."""
+import random
+
+SYLLABLES = (
+    'ба', 'ве', 'ги', 'до', 'жу', 'за', 'ки', 'ло', 'му', 'не', 'по', 'ра',
+    'си', 'то', 'фу', 'ха', 'це', 'ша', 'ка', 'ли', 'ми', 'но', 'ру', 'ту',
+)
+
+
+def seeded(seed):
+    return random.Random(seed)
+
+
+def make_words(rng, count):
+    return [
+        ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(count)
+    ]
+
+
+def make_name(rng, words):
+    return ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
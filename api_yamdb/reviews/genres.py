@@ -0,0 +1,80 @@
+from django.db.models import (
+    BigIntegerField, F, OuterRef, Q, Subquery, Sum, Value)
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Genre, GenreTitle, Title, take_genre_bit
+
+
+def bit_value(bit):
+    return Cast(Value(1), BigIntegerField()).bitleftshift(bit)
+
+
+def rebuild_genre_masks(titles):
+    """Recalculate genre masks of the titles from their genres."""
+    # A title links a genre once, so the sum of the bits is their OR.
+    masks = (
+        GenreTitle.objects.filter(
+            title=OuterRef('pk'), genre__bit__isnull=False)
+        .order_by().values('title')
+        .annotate(mask=Sum(bit_value(F('genre__bit')),
+                           output_field=BigIntegerField()))
+        .values('mask')
+    )
+    titles.update(genre_mask=Coalesce(
+        Subquery(masks, output_field=BigIntegerField()), 0))
+
+
+def assign_genre_bits():
+    """Give free bits to genres without one, return how many got one."""
+    assigned = 0
+    for genre_id in Genre.all_objects.filter(bit=None).order_by(
+            'pk').values_list('pk', flat=True):
+        genre = Genre.all_objects.filter(pk=genre_id)
+        if take_genre_bit(lambda bit: genre.update(bit=bit)) is None:
+            break
+        assigned += 1
+    return assigned
+
+
+def clear_genre_bits(links):
+    """Drop the bits of the given title-genre links from the masks."""
+    by_bit = {}
+    for title_id, bit in links.exclude(genre__bit=None).values_list(
+            'title_id', 'genre__bit'):
+        by_bit.setdefault(bit, []).append(title_id)
+    for bit, title_ids in by_bit.items():
+        Title.all_objects.filter(pk__in=title_ids).update(
+            genre_mask=F('genre_mask').bitand(~(1 << bit)))
+
+
+def filter_by_genres(queryset, slugs, match_all):
+    """Titles with all or with any of the genres, without duplicates.
+
+    Genres with a bit are matched on Title.genre_mask, without a join.
+    The rare genre created after all bits were taken falls back to an
+    IN subquery on the links.
+    """
+    slugs = set(slugs)
+    genres = dict(Genre.objects.filter(slug__in=slugs).values_list(
+        'slug', 'bit'))
+    if not genres or (match_all and len(genres) < len(slugs)):
+        return queryset.none()
+    mask = sum(1 << bit for bit in genres.values() if bit is not None)
+    unmasked = [slug for slug, bit in genres.items() if bit is None]
+    if mask:
+        queryset = queryset.annotate(
+            genre_hits=F('genre_mask').bitand(mask))
+    if match_all:
+        if mask:
+            queryset = queryset.filter(genre_hits=mask)
+        for slug in unmasked:
+            queryset = queryset.filter(pk__in=GenreTitle.objects.filter(
+                genre__slug=slug).values('title'))
+        return queryset
+    condition = Q()
+    if mask:
+        condition |= Q(genre_hits__gt=0)
+    if unmasked:
+        condition |= Q(pk__in=GenreTitle.objects.filter(
+            genre__slug__in=unmasked).values('title'))
+    return queryset.filter(condition)
@@ -0,0 +1,188 @@
+import time
+from datetime import timedelta
+from itertools import islice
+
+from api.cache import bump_version
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from reviews.bulk import insert_objects, reset_sequences
+from reviews.fake import make_name, make_words, seeded
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import CustomUser
+
+
+def next_id(model):
+    # Soft-deleted rows keep their ids until the purge.
+    top = model._base_manager.aggregate(top=Max('id'))['top']
+    return (top or 0) + 1
+
+
+def zipf_counts(total, size, exponent, cap):
+    """Split total between size slots by rank, at most cap per slot.
+
+    The slot of rank k gets a share proportional to 1 / k ** exponent,
+    exponent 0 splits evenly. What rounding and the cap cut off is handed
+    out one by one from the top rank down.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = [min(cap, int(weight * scale)) for weight in weights]
+    missing = total - sum(counts)
+    while missing > 0:
+        open_slots = [index for index, count in enumerate(counts)
+                      if count < cap]
+        if not open_slots:
+            break
+        for index in open_slots[:missing]:
+            counts[index] += 1
+        missing -= min(missing, len(open_slots))
+    return counts
+
+
+class Command(BaseCommand):
+    help = ('Generates a synthetic dataset of users, categories, genres, '
+            'titles, reviews and comments for scale testing')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=100000,
+                            help='Total reviews, at most one per user and '
+                                 'title')
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help='Exponent of the Zipf distribution of '
+                                 'reviews per title, 0 for uniform')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Reviews and comments are spread over '
+                                 'this many past days')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--no-copy', action='store_true',
+                            help='Use INSERT instead of PostgreSQL COPY')
+
+    def handle(self, *args, **options):
+        for name in ('users', 'categories', 'genres', 'titles'):
+            if options[name] < 1:
+                raise CommandError(f'at least one of {name} is required')
+        if options['batch_size'] < 1:
+            raise CommandError('batch size must be positive')
+        self.options = options
+        self.use_copy = (connection.vendor == 'postgresql'
+                         and not options['no_copy'])
+        self.rng = seeded(options['seed'])
+        self.words = make_words(self.rng, 5000)
+        self.now = timezone.now()
+        users = self.write(CustomUser, self.users)
+        categories = self.write(Category, self.categories)
+        genres = self.write(Genre, self.genres)
+        titles = self.write(Title, self.titles, categories)
+        self.write(GenreTitle, self.genre_titles, titles, genres)
+        reviews = self.write(Review, self.reviews, titles, users)
+        if options['comments'] and len(reviews):
+            self.write(Comment, self.comments, reviews, users)
+        reset_sequences(
+            [CustomUser, Category, Genre, Title, GenreTitle, Review, Comment])
+        for model in (Category, Genre, Title, CustomUser):
+            bump_version(model)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        call_command('rebuild_counters', stdout=self.stdout)
+        call_command('rebuild_genre_masks', stdout=self.stdout)
+
+    def write(self, model, build, *args):
+        """Insert what build(first_id, *args) yields in batches.
+
+        Return the range of ids the objects got.
+        """
+        first = next_id(model)
+        started = time.monotonic()
+        count = 0
+        objs = build(first, *args)
+        while True:
+            batch = list(islice(objs, self.options['batch_size']))
+            if not batch:
+                break
+            for number, obj in enumerate(batch, first + count):
+                obj.id = number
+            with transaction.atomic():
+                insert_objects(model, batch, self.use_copy)
+            count += len(batch)
+        rate = count / max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully generated {model.__name__}: {count} rows, '
+            f'{rate:.0f} rows/sec\n'))
+        return range(first, first + count)
+
+    def text(self, low, high):
+        rng = self.rng
+        return ' '.join(rng.choices(self.words, k=rng.randint(low, high)))
+
+    def past(self):
+        """Random moment of the last --days days."""
+        span = timedelta(days=self.options['days'])
+        return self.now - span * self.rng.random()
+
+    def users(self, first):
+        for number in range(first, first + self.options['users']):
+            yield CustomUser(
+                username=f'gen_user{number}',
+                email=f'gen_user{number}@yamdb.fake',
+                password='!', bio=self.text(0, 10),
+            )
+
+    def categories(self, first):
+        for number in range(first, first + self.options['categories']):
+            yield Category(name=make_name(self.rng, self.words)[:256],
+                           slug=f'gen-category-{number}')
+
+    def genres(self, first):
+        for number in range(first, first + self.options['genres']):
+            yield Genre(name=make_name(self.rng, self.words)[:256],
+                        slug=f'gen-genre-{number}')
+
+    def titles(self, first, categories):
+        rng = self.rng
+        for _ in range(self.options['titles']):
+            yield Title(
+                name=make_name(rng, self.words)[:200],
+                year=rng.randint(1900, self.now.year),
+                description=self.text(0, 20)[:200],
+                category_id=rng.choice(categories),
+            )
+
+    def genre_titles(self, first, titles, genres):
+        for title_id in titles:
+            for genre_id in self.rng.sample(
+                    genres, self.rng.randint(1, min(3, len(genres)))):
+                yield GenreTitle(title_id=title_id, genre_id=genre_id)
+
+    def reviews(self, first, titles, users):
+        rng = self.rng
+        counts = zipf_counts(
+            self.options['reviews'], len(titles), self.options['zipf'],
+            cap=len(users))
+        order = list(titles)
+        rng.shuffle(order)
+        for title_id, count in zip(order, counts):
+            # Titles differ in quality, scores of one title gather round it.
+            quality = rng.uniform(3, 9)
+            for author_id in rng.sample(users, count):
+                yield Review(
+                    title_id=title_id, author_id=author_id,
+                    text=self.text(5, 40),
+                    score=min(10, max(1, round(rng.gauss(quality, 2)))),
+                    pub_date=self.past(),
+                )
+
+    def comments(self, first, reviews, users):
+        rng = self.rng
+        for _ in range(self.options['comments']):
+            yield Comment(
+                review_id=rng.choice(reviews), author_id=rng.choice(users),
+                text=self.text(1, 20), pub_date=self.past(),
+            )
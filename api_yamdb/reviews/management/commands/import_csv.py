@@ -1,12 +1,52 @@
 import csv
+import os
+import resource
+import time
+from itertools import islice
 
+from api.cache import bump_version
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
+from django.db import DataError, IntegrityError, connection, transaction
+from reviews.bulk import insert_objects, reset_sequences
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 from users.models import CustomUser
 
+# Files of a dump directory in the order their foreign keys require.
+IMPORT_ORDER = (
+    'users.csv',
+    'category.csv',
+    'genre.csv',
+    'titles.csv',
+    'genre_title.csv',
+    'review.csv',
+    'comments.csv',
+)
+
+CSV_MODELS = {
+    'Users': (CustomUser, ('id', 'username', 'email', 'role', 'bio',
+                           'first_name', 'last_name')),
+    'Category': (Category, ('id', 'name', 'slug')),
+    'Genre': (Genre, ('id', 'name', 'slug')),
+    'Titles': (Title, ('id', 'name', 'year', 'category_id')),
+    'GenreTitle': (GenreTitle, ('id', 'title_id', 'genre_id')),
+    'Review': (Review, ('id', 'title_id', 'text', 'author_id', 'score',
+                        'pub_date')),
+    'Comments': (Comment, ('id', 'review_id', 'text', 'author_id',
+                           'pub_date')),
+}
+
+# Errors of a single row the database or a field rejects.
+ROW_ERRORS = (DataError, IntegrityError, ValidationError, ValueError)
+
+
+def peak_memory_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
 
 class Command(BaseCommand):
-    help = 'Closes the specified poll for voting'
+    help = 'Imports .csv dumps into the database'
 
     def add_arguments(self, parser):
         parser.add_argument('-f',
@@ -14,108 +54,158 @@ class Command(BaseCommand):
                             action='store',
                             help='Input file .csv',
                             )
+        parser.add_argument('-d',
+                            '--dir',
+                            action='store',
+                            help='Directory with .csv files, imported in '
+                                 'dependency order',
+                            )
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=5000,
+                            help='Rows written per transaction',
+                            )
+        parser.add_argument('--no-copy',
+                            action='store_true',
+                            help='Use INSERT instead of PostgreSQL COPY',
+                            )
 
     def handle(self, *args, **options):
-        if not options['file']:
+        if options['dir']:
+            paths = [
+                os.path.join(options['dir'], filename)
+                for filename in IMPORT_ORDER
+                if os.path.exists(os.path.join(options['dir'], filename))
+            ]
+            if not paths:
+                raise CommandError('no .csv files to import in directory')
+        elif options['file']:
+            paths = [options['file']]
+        else:
             raise CommandError('you have to set up filepath')
-        filepath = options['file']
-        filename = filepath.split('/')[-1]
+        if options['batch_size'] < 1:
+            raise CommandError('batch size must be positive')
+        self.use_copy = (connection.vendor == 'postgresql'
+                         and not options['no_copy'])
+        self.known_ids = {}
+        models = [self.get_model(path) for path in paths]
+        for path, (model_name, model, columns) in zip(paths, models):
+            self.import_file(
+                path, model_name, model, columns, options['batch_size'])
+        self.refresh_derived({model for _, model, _ in models})
+
+    def refresh_derived(self, changed):
+        """Rebuild what the imported models feed and expire the caches."""
+        if Title in changed:
+            call_command('rebuild_search_index', stdout=self.stdout)
+        if changed & {Review, Comment}:
+            call_command('rebuild_counters', stdout=self.stdout)
+        if changed & {Genre, GenreTitle}:
+            call_command('rebuild_genre_masks', stdout=self.stdout)
+        # Rows were written without post_save, cached lists, counts and
+        # the autocomplete indexes learn about them from the versions.
+        if changed & {Review, Comment, Genre, GenreTitle}:
+            # Ratings and genre masks of titles were rebuilt.
+            changed.add(Title)
+        for model in changed:
+            bump_version(model)
+
+    def get_model(self, filepath):
+        filename = os.path.basename(filepath)
         if not filename.endswith('.csv'):
             raise CommandError('only .csv file allowed')
         model_name = filename.replace(
             '.csv', '').replace('_', ' ').title().replace(' ', '')
+        try:
+            model, columns = CSV_MODELS[model_name]
+        except KeyError:
+            raise CommandError(f'No model named {model_name}')
+        return model_name, model, columns
+
+    def get_known_ids(self, model):
+        """Primary keys of the model, loaded once and kept up to date."""
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('pk', flat=True))
+        return self.known_ids[model]
+
+    def import_file(self, filepath, model_name, model, columns, batch_size):
+        foreign_keys = [
+            (column, model._meta.get_field(column[:-3]).related_model)
+            for column in columns if column.endswith('_id')
+        ]
+        started = time.monotonic()
+        imported = skipped = 0
         with open(filepath, 'r', encoding='utf-8') as file:
-            csv_file = csv.reader(file)
-            next(csv_file)
-            callbacks = {
-                'Category': self.parse_csv_category(csv_file, model_name),
-                'Genre': self.parse_csv_genre(csv_file, model_name),
-                'Titles': self.parse_csv_title(csv_file, model_name),
-                'Review': self.parse_csv_review(csv_file, model_name),
-                'Comments': self.parse_csv_comment(csv_file, model_name),
-                'GenreTitle': self.parse_csv_genreTitle(csv_file, model_name),
-                'Users': self.parse_csv_users(csv_file, model_name)
-            }
+            rows = csv.reader(file)
+            next(rows, None)
+            while True:
+                batch = [
+                    (rows.line_num, row) for row in islice(rows, batch_size)]
+                if not batch:
+                    break
+                objs = self.build_objects(
+                    filepath, model, columns, foreign_keys, batch)
+                written = self.insert_batch(filepath, model, objs)
+                imported += written
+                skipped += len(batch) - written
+        reset_sequences([model])
+        rate = imported / max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully imported {model_name}: {imported} rows, '
+            f'{skipped} skipped, {rate:.0f} rows/sec, '
+            f'peak memory {peak_memory_mb():.1f} MB\n'))
+
+    def report(self, filepath, line, error):
+        self.stderr.write(f'{filepath}:{line}: {error}, row skipped')
+
+    def build_objects(self, filepath, model, columns, foreign_keys, rows):
+        """Build (line, instance) pairs of new rows whose foreign keys
+        exist. Rows with ids that are not numbers are reported."""
+        own_ids = self.get_known_ids(model)
+        objs = []
+        for line, row in rows:
+            if len(row) != len(columns):
+                continue
+            values = dict(zip(columns, row))
+            try:
+                pk = int(values['id'])
+                keys = [(int(values[column]), related)
+                        for column, related in foreign_keys]
+            except ValueError as error:
+                self.report(filepath, line, error)
+                continue
+            if pk in own_ids or any(
+                    key not in self.get_known_ids(related)
+                    for key, related in keys):
+                continue
+            own_ids.add(pk)
+            objs.append((line, model(**values)))
+        return objs
+
+    def insert_batch(self, filepath, model, objs):
+        """Write the (line, instance) pairs, return how many were written.
+
+        A batch the database rejects, for example for a second review of
+        the same author, is written again row by row, so only the failing
+        rows are reported and skipped.
+        """
+        try:
+            with transaction.atomic():
+                insert_objects(
+                    model, [obj for _, obj in objs], self.use_copy)
+            return len(objs)
+        # COPY raises the exceptions of the driver, not of Django.
+        except Exception:
+            pass
+        written = 0
+        for line, obj in objs:
             try:
-                callbacks[model_name]
-            except KeyError:
-                raise CommandError(f'No model named {model_name}')
-            return
-
-    def parse_csv_category(self, csv_file, model_name):
-        if model_name == 'Category':
-            for row in csv_file:
-                Category.objects.update_or_create(name=row[1],
-                                                  slug=row[2])
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully imported {model_name}\n'))
-        return
-
-    def parse_csv_genre(self, csv_file, model_name):
-        if model_name == 'Genre':
-            for row in csv_file:
-                Genre.objects.update_or_create(name=row[1],
-                                               slug=row[2])
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully imported {model_name}\n'))
-        return
-
-    def parse_csv_title(self, csv_file, model_name):
-        if model_name == 'Titles':
-            for row in csv_file:
-                Title.objects.update_or_create(
-                    name=row[1],
-                    year=row[2],
-                    category=Category.objects.get(id=row[3])
-                )
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully imported {model_name}\n'))
-        return
-
-    def parse_csv_review(self, csv_file, model_name):
-        if model_name == 'Review':
-            for row in csv_file:
-                Review.objects.update_or_create(
-                    title=Title.objects.get(id=row[1]),
-                    text=row[2],
-                    author=CustomUser.objects.get(
-                        id=row[3]),
-                    score=row[4],
-                    pub_date=row[5])
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully imported {model_name}\n'))
-        return
-
-    def parse_csv_comment(self, csv_file, model_name):
-        if model_name == 'Comments':
-            for row in csv_file:
-                Comment.objects.update_or_create(
-                    review=Review.objects.get(id=row[1]),
-                    text=row[2],
-                    author=CustomUser.objects.get(id=row[3]),
-                    pub_date=row[4])
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully imported {model_name}\n'))
-        return
-
-    def parse_csv_genretitle(self, csv_file, model_name):
-        if model_name == 'GenreTitle':
-            for row in csv_file:
-                GenreTitle.objects.update_or_create(
-                    title=Title.objects.get(id=row[1]),
-                    genre=Genre.objects.get(id=row[2]))
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully imported {model_name}\n'))
-        return
-
-    def parse_csv_users(self, csv_file, model_name):
-        if model_name == 'Users':
-            for row in csv_file:
-                CustomUser.objects.update_or_create(id=row[0], username=row[1],
-                                                    email=row[2], role=row[3],
-                                                    bio=row[4],
-                                                    first_name=row[5],
-                                                    last_name=row[6])
-            self.stdout.write(
-                self.style.SUCCESS(f'Successfully imported {model_name}\n'))
-        return
+                with transaction.atomic():
+                    insert_objects(model, [obj])
+            except ROW_ERRORS as error:
+                self.get_known_ids(model).discard(obj.pk)
+                self.report(filepath, line, error)
+            else:
+                written += 1
+        return written
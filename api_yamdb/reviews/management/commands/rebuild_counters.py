@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import Review, Title
+from reviews.ratings import (
+    rebuild_comment_counts, rebuild_in_chunks, rebuild_ratings)
+
+
+class Command(BaseCommand):
+    help = ('Rebuilds review counts and ratings of titles and comment '
+            'counts of reviews')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            default=1000,
+                            help='Rows updated per transaction',
+                            )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('chunk size must be positive')
+        for model, rebuild in ((Title, rebuild_ratings),
+                               (Review, rebuild_comment_counts)):
+            rebuilt = rebuild_in_chunks(
+                model.objects.all(), rebuild, chunk_size)
+            self.stdout.write(self.style.SUCCESS(
+                f'Successfully rebuilt counters of {rebuilt} '
+                f'{model.__name__} rows\n'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.genres import assign_genre_bits, rebuild_genre_masks
+from reviews.models import Title
+from reviews.ratings import rebuild_in_chunks
+
+
+class Command(BaseCommand):
+    help = ('Gives genres without one a bit of the genre mask and rebuilds '
+            'genre masks of all titles')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            default=1000,
+                            help='Titles updated per transaction',
+                            )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('chunk size must be positive')
+        assigned = assign_genre_bits()
+        rebuilt = rebuild_in_chunks(
+            Title.all_objects.all(), rebuild_genre_masks, chunk_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully assigned {assigned} genre bits and rebuilt '
+            f'{rebuilt} genre masks\n'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import Title
+from reviews.ratings import rebuild_in_chunks, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds stored ratings of all titles from their reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            default=1000,
+                            help='Titles updated per transaction',
+                            )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('chunk size must be positive')
+        rebuilt = rebuild_in_chunks(
+            Title.objects.all(), rebuild_ratings, chunk_size)
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt {rebuilt} ratings\n'))
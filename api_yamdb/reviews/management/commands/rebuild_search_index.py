@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from reviews.search import get_title_search
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the title search index from the titles table'
+
+    def handle(self, *args, **options):
+        get_title_search().rebuild()
+        self.stdout.write(
+            self.style.SUCCESS('Successfully rebuilt search index\n'))
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+from reviews.search import FTS_TABLE, sqlite_has_trigram
+
+TRIGRAM_INDEXES = {
+    'title_name_trgm_idx': 'name',
+    'title_description_trgm_idx': 'description',
+}
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, column in TRIGRAM_INDEXES.items():
+            schema_editor.execute(
+                f'CREATE INDEX {name} ON reviews_title '
+                f'USING gin (UPPER({column}::text) gin_trgm_ops)')
+    elif vendor == 'sqlite' and sqlite_has_trigram():
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} "
+            f"USING fts5(name, description, tokenize='trigram')")
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'SELECT id, name, description FROM reviews_title')
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for name in TRIGRAM_INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_pub_date_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:08
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, F, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+GENRE_MASK_BITS = 63
+
+
+def drop_duplicate_links(apps, schema_editor):
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    first_ids = GenreTitle.objects.order_by().values(
+        'title', 'genre').annotate(first_id=Min('id')).values_list(
+        'first_id', flat=True)
+    GenreTitle.objects.exclude(id__in=list(first_ids)).delete()
+
+
+def fill_genre_masks(apps, schema_editor):
+    Genre = apps.get_model('reviews', 'Genre')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    Title = apps.get_model('reviews', 'Title')
+    genre_ids = Genre.objects.order_by('id').values_list('id', flat=True)
+    for bit, genre_id in zip(range(GENRE_MASK_BITS), list(genre_ids)):
+        Genre.objects.filter(id=genre_id).update(bit=bit)
+    masks = (
+        GenreTitle.objects.filter(
+            title=OuterRef('pk'), genre__bit__isnull=False)
+        .order_by().values('title')
+        .annotate(mask=Sum(
+            models.Value(1, BigIntegerField()).bitleftshift(F('genre__bit')),
+            output_field=BigIntegerField()))
+        .values('mask')
+    )
+    Title.objects.update(genre_mask=Coalesce(
+        Subquery(masks, output_field=BigIntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_links, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='genre',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, unique=True, verbose_name='Бит жанра'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='genre_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Маска жанров'),
+        ),
+        migrations.AddConstraint(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique_genre_title'),
+        ),
+        migrations.RunPython(fill_genre_masks, migrations.RunPython.noop),
+    ]
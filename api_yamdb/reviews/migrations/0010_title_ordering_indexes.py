@@ -0,0 +1,72 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+# A descending index puts NULLs first on PostgreSQL, top rated lists want
+# unrated titles last. SQLite sorts NULLs last in DESC on its own and
+# scans title_rating_idx backwards.
+TOP_RATED_INDEXES = {
+    'title_top_rated_idx': '',
+    'title_cat_top_rated_idx': 'category_id, ',
+}
+
+
+def create_top_rated_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, prefix in TOP_RATED_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX {name} ON reviews_title '
+            f'({prefix}rating DESC NULLS LAST, id DESC) '
+            f'WHERE deleted_at IS NULL')
+
+
+def drop_top_rated_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TOP_RATED_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_genre_mask'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['rating', 'id'], name='title_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['year', 'id'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['review_count', 'id'], name='title_review_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['name', 'id'], name='title_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['category', 'rating', 'id'], name='title_cat_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['category', 'year', 'id'], name='title_cat_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['category', 'review_count', 'id'], name='title_cat_review_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['category', 'name', 'id'], name='title_cat_name_idx'),
+        ),
+        migrations.RunPython(
+            create_top_rated_indexes, drop_top_rated_indexes),
+    ]
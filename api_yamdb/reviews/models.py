@@ -1,15 +1,22 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from users.deletion import SoftDeleteModel
 from users.models import CustomUser
 
+# Bits of a signed 64-bit column that are safe to set.
+GENRE_MASK_BITS = 63
 
-class Category(models.Model):
+
+class Category(SoftDeleteModel):
     name = models.CharField(
         _('Имя категории'), max_length=256, blank=False)
     slug = models.SlugField(
         _('Slug категории'), unique=True, max_length=50, blank=False)
 
+    released_fields = ('slug',)
+
     class Meta:
         verbose_name = _('Категория')
         verbose_name_plural = _('Категории')
@@ -18,11 +25,16 @@ class Category(models.Model):
         return self.slug
 
 
-class Genre(models.Model):
+class Genre(SoftDeleteModel):
     name = models.CharField(
         _('Имя жанра'), max_length=256, blank=False)
     slug = models.SlugField(
         _('Slug жанра'), unique=True)
+    # Position of the genre in Title.genre_mask, None once all are taken.
+    bit = models.PositiveSmallIntegerField(
+        _('Бит жанра'), unique=True, null=True, editable=False)
+
+    released_fields = ('slug',)
 
     class Meta:
         verbose_name = _('Жанр')
@@ -31,20 +43,101 @@ class Genre(models.Model):
     def __str__(self):
         return self.slug
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding or self.bit is not None:
+            super().save(*args, **kwargs)
+            return
+
+        def insert(bit):
+            self.bit = bit
+            super(Genre, self).save(*args, **kwargs)
+
+        take_genre_bit(insert)
+
+
+def free_genre_bit():
+    """Lowest bit of the genre mask no genre holds, None if all are."""
+    taken = set(Genre.all_objects.exclude(bit=None).values_list(
+        'bit', flat=True))
+    return next(
+        (bit for bit in range(GENRE_MASK_BITS) if bit not in taken), None)
 
-class Title(models.Model):
+
+def take_genre_bit(write):
+    """Call write(bit) with the lowest free bit and return the bit.
+
+    Two writers may read the same free bit, the unique column rejects
+    the later one, which picks the next free bit and tries again.
+    """
+    while True:
+        bit = free_genre_bit()
+        try:
+            with transaction.atomic():
+                write(bit)
+            return bit
+        except IntegrityError:
+            # Any other constraint, such as the slug, fails as usual.
+            if bit is None or not Genre.all_objects.filter(
+                    bit=bit).exists():
+                raise
+
+
+class Title(SoftDeleteModel):
     name = models.CharField(_('Название'), max_length=200, blank=False)
     year = models.IntegerField(_('Год выпуска'), blank=False)
     description = models.CharField(_('Описание'), max_length=200)
-    rating = models.IntegerField(_('Рейтинг'), null=True)
+    rating = models.IntegerField(_('Рейтинг'), null=True, editable=False)
+    score_sum = models.PositiveIntegerField(
+        _('Сумма оценок'), default=0, editable=False)
+    review_count = models.PositiveIntegerField(
+        _('Количество отзывов'), default=0, editable=False)
+    # Bumped with every change of the title, its reviews or comments,
+    # validates cached responses of the title and its nested lists.
+    version = models.PositiveIntegerField(
+        _('Версия'), default=0, editable=False)
+    modified_at = models.DateTimeField(
+        _('Изменено'), default=timezone.now, editable=False)
+    # One bit per genre of the title, see Genre.bit.
+    genre_mask = models.BigIntegerField(
+        _('Маска жанров'), default=0, editable=False)
     genre = models.ManyToManyField(
         Genre, through='GenreTitle', blank=False)
     category = models.ForeignKey(
-        Category, on_delete=models.DO_NOTHING, blank=False)
+        Category, on_delete=models.SET_NULL, null=True, blank=False)
 
     class Meta:
         verbose_name = _('Произведение')
         verbose_name_plural = _('Произведения')
+        # One index per ordering of the titles list, alone and within a
+        # category, with the id that breaks ties. Only live rows.
+        indexes = [
+            models.Index(fields=['rating', 'id'], name='title_rating_idx',
+                         condition=models.Q(deleted_at__isnull=True)),
+            models.Index(fields=['year', 'id'], name='title_year_idx',
+                         condition=models.Q(deleted_at__isnull=True)),
+            models.Index(fields=['review_count', 'id'],
+                         name='title_review_count_idx',
+                         condition=models.Q(deleted_at__isnull=True)),
+            models.Index(fields=['name', 'id'], name='title_name_idx',
+                         condition=models.Q(deleted_at__isnull=True)),
+            models.Index(fields=['category', 'rating', 'id'],
+                         name='title_cat_rating_idx',
+                         condition=models.Q(deleted_at__isnull=True)),
+            models.Index(fields=['category', 'year', 'id'],
+                         name='title_cat_year_idx',
+                         condition=models.Q(deleted_at__isnull=True)),
+            models.Index(fields=['category', 'review_count', 'id'],
+                         name='title_cat_review_count_idx',
+                         condition=models.Q(deleted_at__isnull=True)),
+            models.Index(fields=['category', 'name', 'id'],
+                         name='title_cat_name_idx',
+                         condition=models.Q(deleted_at__isnull=True)),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The post_save receiver updates the search index of the title.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 
 class GenreTitle(models.Model):
@@ -54,9 +147,15 @@ class GenreTitle(models.Model):
     class Meta:
         verbose_name = _('Жанр-произведение')
         verbose_name_plural = _('Жанры-произведения')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'genre'],
+                name='unique_genre_title'
+            )
+        ]
 
 
-class Review(models.Model):
+class Review(SoftDeleteModel):
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -80,6 +179,8 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         _('Дата добавления'), auto_now_add=True
     )
+    comment_count = models.PositiveIntegerField(
+        _('Количество комментариев'), default=0, editable=False)
 
     class Meta:
         verbose_name = _('Отзыв')
@@ -91,6 +192,38 @@ class Review(models.Model):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_score()
+        return instance
+
+    def remember_score(self):
+        """Store the title and score the rating of the title was built on."""
+        score = self.__dict__.get('score')
+        if self.__dict__.get('deleted_at') is not None:
+            # Soft-deleted reviews are not part of the rating any more.
+            score = None
+        self._stored_score = (self.__dict__.get('title_id'), score)
+
+    def save(self, *args, **kwargs):
+        # The stored rating of the title is updated by the post_save
+        # receiver, both writes have to land in one transaction.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class CommentManager(models.Manager):
+    """Leave out comments of deleted users until they are purged."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            author__deleted_at__isnull=True)
 
 
 class Comment(models.Model):
@@ -109,7 +242,19 @@ class Comment(models.Model):
         _('Дата добавления'), auto_now_add=True
     )
 
+    objects = CommentManager()
+    all_objects = models.Manager()
+
     class Meta:
         verbose_name = _('Комментарий')
         verbose_name_plural = _('Комментарии')
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The post_save receiver counts the comment on its review.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
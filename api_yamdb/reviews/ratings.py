@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.db.models import (
+    Case, Count, F, IntegerField, OuterRef, Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment, Review, Title
+
+
+def touched():
+    """Update values that mark a title as changed."""
+    return {'version': F('version') + 1, 'modified_at': timezone.now()}
+
+
+def touch_titles(titles):
+    titles.update(**touched())
+
+
+def shift_title_score(title_id, score_delta, count_delta):
+    """Apply a review change to the stored rating of the title.
+
+    Works in a single UPDATE on top of the current column values, so
+    concurrent reviews of the same title never overwrite each other.
+    """
+    score_sum = F('score_sum') + score_delta
+    review_count = F('review_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        **touched(),
+        score_sum=score_sum,
+        review_count=review_count,
+        rating=Case(
+            When(review_count__lte=-count_delta, then=Value(None)),
+            default=score_sum / review_count,
+            output_field=IntegerField(),
+        ),
+    )
+
+
+def shift_comment_count(review_id, delta):
+    Review.all_objects.filter(pk=review_id).update(
+        comment_count=F('comment_count') + delta)
+
+
+def rebuild_ratings(titles):
+    """Recalculate stored ratings of the titles from their reviews."""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    with transaction.atomic():
+        titles.update(
+            score_sum=Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total'),
+                output_field=IntegerField()), 0),
+            review_count=Coalesce(Subquery(
+                reviews.annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField()), 0),
+        )
+        titles.update(**touched(), rating=Case(
+            When(review_count=0, then=Value(None)),
+            default=F('score_sum') / F('review_count'),
+            output_field=IntegerField(),
+        ))
+
+
+def rebuild_comment_counts(reviews):
+    """Recount stored comment counts of the reviews."""
+    comments = Comment.objects.filter(
+        review=OuterRef('pk')).order_by().values('review')
+    reviews.update(comment_count=Coalesce(Subquery(
+        comments.annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField()), 0))
+
+
+def rebuild_in_chunks(queryset, rebuild, chunk_size):
+    """Apply rebuild to ranges of chunk_size rows, return the row count."""
+    last_id = 0
+    rebuilt = 0
+    while True:
+        ids = list(
+            queryset.filter(pk__gt=last_id).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return rebuilt
+        rebuild(queryset.filter(pk__gte=ids[0], pk__lte=ids[-1]))
+        last_id = ids[-1]
+        rebuilt += len(ids)
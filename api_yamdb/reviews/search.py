@@ -0,0 +1,132 @@
+import sqlite3
+from functools import lru_cache, reduce
+from operator import add, or_
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+
+FTS_TABLE = 'reviews_title_fts'
+# Trigram indexes only help queries of at least three characters.
+MIN_INDEXED_LENGTH = 3
+
+
+@lru_cache(maxsize=None)
+def sqlite_has_trigram():
+    """Whether the SQLite library supports the FTS5 trigram tokenizer."""
+    try:
+        sqlite3.connect(':memory:').execute(
+            "CREATE VIRTUAL TABLE t USING fts5(a, tokenize='trigram')")
+    except sqlite3.Error:
+        return False
+    return True
+
+
+class TitleSearch:
+    """Case-insensitive substring search over title fields.
+
+    Terms are ``(query, fields)`` pairs, a title matches when every
+    query is found in one of its fields. Backends filter the queryset
+    with an index, annotate it with ``search_rank`` (higher is more
+    relevant) and order by it.
+    """
+
+    def filter(self, queryset, terms):
+        queryset = self.contains(queryset, terms)
+        return queryset.annotate(
+            search_rank=Value(0, output_field=FloatField()))
+
+    def contains(self, queryset, terms):
+        for query, fields in terms:
+            queryset = queryset.filter(reduce(or_, (
+                Q(**{f'{field}__icontains': query}) for field in fields)))
+        return queryset
+
+    def update(self, title):
+        """Put the current state of the title into the index."""
+
+    def delete(self, title_id):
+        """Remove the title from the index."""
+
+    def rebuild(self):
+        """Index all titles from scratch."""
+
+
+class PostgresTitleSearch(TitleSearch):
+    """pg_trgm GIN indexes on UPPER(name) and UPPER(description).
+
+    ``icontains`` compiles to ``UPPER(field::text) LIKE UPPER(%s)``, which
+    the indexes serve, PostgreSQL keeps them in sync on its own.
+    """
+
+    def filter(self, queryset, terms):
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        queryset = self.contains(queryset, terms)
+        return queryset.annotate(search_rank=reduce(add, (
+            TrigramSimilarity(field, query)
+            for query, fields in terms for field in fields
+        ))).order_by('-search_rank', 'id')
+
+
+class SqliteTitleSearch(TitleSearch):
+    """FTS5 table with the trigram tokenizer, rowid is the title id."""
+
+    def filter(self, queryset, terms):
+        indexed = [
+            (query, fields) for query, fields in terms
+            if len(query) >= MIN_INDEXED_LENGTH
+        ]
+        if not indexed:
+            return super().filter(queryset, terms)
+        queryset = self.contains(queryset, [
+            (query, fields) for query, fields in terms
+            if len(query) < MIN_INDEXED_LENGTH
+        ])
+        # All indexed terms go into one MATCH, the index table can only
+        # be joined once.
+        match = ' AND '.join(
+            self.phrase(query, fields) for query, fields in indexed)
+        # A join keeps MATCH to one pass over the index, the ORM can only
+        # express it as a correlated subquery per title.
+        return queryset.extra(
+            select={'search_rank': f'-{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = reviews_title.id',
+                   f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).order_by('-search_rank', 'id')
+
+    def phrase(self, query, fields):
+        phrase = '"%s"' % query.replace('"', '""')
+        if len(fields) == 1:
+            phrase = f'{fields[0]} : {phrase}'
+        return f'({phrase})'
+
+    def update(self, title):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+                f'VALUES (%s, %s, %s)',
+                [title.pk, title.name, title.description])
+
+    def delete(self, title_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+                f'SELECT id, name, description FROM reviews_title')
+
+
+def get_title_search():
+    if connection.vendor == 'postgresql':
+        return PostgresTitleSearch()
+    if connection.vendor == 'sqlite' and sqlite_has_trigram():
+        return SqliteTitleSearch()
+    return TitleSearch()
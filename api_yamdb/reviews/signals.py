@@ -0,0 +1,171 @@
+from django.db.models import Count, Sum
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from users.deletion import (
+    post_purge_detach, post_soft_delete, pre_purge_chunk)
+from users.models import CustomUser
+
+from .genres import clear_genre_bits, rebuild_genre_masks
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .ratings import (
+    rebuild_ratings, shift_comment_count, shift_title_score, touch_titles)
+from .search import get_title_search
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    stored_title_id, stored_score = getattr(
+        instance, '_stored_score', (None, None))
+    score = int(instance.score)
+    if instance.deleted_at is not None:
+        # A soft-deleted review leaves the rating right away.
+        if stored_score is not None:
+            shift_title_score(stored_title_id, -int(stored_score), -1)
+    elif created:
+        shift_title_score(instance.title_id, score, 1)
+    elif stored_title_id is None or stored_score is None:
+        rebuild_ratings(Title.objects.filter(pk=instance.title_id))
+    elif stored_title_id != instance.title_id:
+        shift_title_score(stored_title_id, -int(stored_score), -1)
+        shift_title_score(instance.title_id, score, 1)
+    elif int(stored_score) != score:
+        shift_title_score(instance.title_id, score - int(stored_score), 0)
+    else:
+        touch_titles(Title.objects.filter(pk=instance.title_id))
+    instance.remember_score()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    if instance.deleted_at is None:
+        shift_title_score(instance.title_id, -int(instance.score), -1)
+
+
+@receiver(post_soft_delete, sender=CustomUser)
+def hide_content_of_deleted_user(sender, instance, using, **kwargs):
+    """Take the reviews and comments of the user out of the ratings and
+    comment counts at once, the purge removes them later."""
+    reviews = Review.objects.using(using).filter(author=instance)
+    for row in (reviews.order_by().values('title')
+                .annotate(total=Sum('score'), count=Count('pk'))):
+        shift_title_score(row['title'], -row['total'], -row['count'])
+    reviews.update(deleted_at=instance.deleted_at)
+    # Comment.objects already leaves the comments of the user out.
+    counted = list(
+        Comment.all_objects.using(using).filter(author=instance).order_by()
+        .values('review').annotate(count=Count('pk'))
+    )
+    for row in counted:
+        shift_comment_count(row['review'], -row['count'])
+    touch_titles(Title.all_objects.filter(
+        reviews__in=[row['review'] for row in counted]))
+
+
+@receiver(pre_purge_chunk, sender=Review)
+def update_rating_on_purge(sender, ids, using, **kwargs):
+    # Deleted reviews, those of deleted users included, left the ratings
+    # when they were hidden.
+    counted = (
+        Review.objects.using(using).filter(pk__in=ids).order_by()
+        .values('title').annotate(total=Sum('score'), count=Count('pk'))
+    )
+    for row in counted:
+        shift_title_score(row['title'], -row['total'], -row['count'])
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        shift_comment_count(instance.review_id, 1)
+    touch_titles(Title.all_objects.filter(reviews=instance.review_id))
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_on_delete(sender, instance, **kwargs):
+    shift_comment_count(instance.review_id, -1)
+    touch_titles(Title.all_objects.filter(reviews=instance.review_id))
+
+
+@receiver(pre_purge_chunk, sender=Comment)
+def count_comments_on_purge(sender, ids, using, **kwargs):
+    # Comments of deleted users left the counts when they were hidden.
+    counted = list(
+        Comment.objects.using(using).filter(pk__in=ids).order_by()
+        .values('review').annotate(count=Count('pk'))
+    )
+    for row in counted:
+        shift_comment_count(row['review'], -row['count'])
+    touch_titles(Title.all_objects.filter(
+        reviews__in=[row['review'] for row in counted]))
+
+
+@receiver(post_save, sender=Title)
+def touch_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        touch_titles(Title.all_objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Title)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.deleted_at is not None:
+        get_title_search().delete(instance.pk)
+    else:
+        get_title_search().update(instance)
+
+
+@receiver(post_delete, sender=Title)
+def delete_from_search_index(sender, instance, **kwargs):
+    get_title_search().delete(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_masks(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # The titles of a genre are not known any more after the clear.
+        instance._cleared_title_ids = list(
+            instance.title_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        title_ids = [instance.pk]
+    elif action == 'post_clear':
+        title_ids = instance.__dict__.pop('_cleared_title_ids', [])
+    else:
+        title_ids = pk_set
+    titles = Title.all_objects.filter(pk__in=title_ids)
+    rebuild_genre_masks(titles)
+    touch_titles(titles)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def update_genre_mask(sender, instance, raw=False, **kwargs):
+    if not raw:
+        rebuild_genre_masks(Title.all_objects.filter(pk=instance.title_id))
+
+
+@receiver(pre_purge_chunk, sender=GenreTitle)
+def clear_purged_genre_bits(sender, ids, using, **kwargs):
+    clear_genre_bits(GenreTitle.objects.using(using).filter(pk__in=ids))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def touch_titles_of(sender, instance, created, raw=False, **kwargs):
+    # Titles show the name and slug of their category and genres.
+    if created or raw:
+        return
+    field = 'category' if sender is Category else 'genre'
+    touch_titles(Title.all_objects.filter(**{field: instance}))
+
+
+@receiver(post_purge_detach, sender=Title)
+def touch_detached_titles(sender, ids, using, **kwargs):
+    touch_titles(Title.all_objects.using(using).filter(pk__in=ids))
@@ -0,0 +1,10 @@
+from users.enums import ChoiceEnum
+
+
+class Status(ChoiceEnum):
+    """Class Status(enum)."""
+
+    pending = 'pending'
+    running = 'running'
+    done = 'done'
+    failed = 'failed'
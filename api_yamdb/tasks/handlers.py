@@ -0,0 +1,41 @@
+from django.apps import apps
+from django.core.mail import EmailMessage, get_connection
+
+
+def send_mail(payloads):
+    """Send the messages over a single SMTP connection.
+
+    Yields the error of every message, or None once it is sent.
+    """
+    with get_connection() as connection:
+        for payload in payloads:
+            message = EmailMessage(
+                payload['subject'],
+                payload['message'],
+                payload['from_email'],
+                payload['recipient_list'],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                yield error
+            else:
+                yield None
+
+
+def purge(payloads):
+    """Remove soft-deleted objects together with their dependents."""
+    for payload in payloads:
+        try:
+            apps.get_model(payload['model']).purge(payload['pk'])
+        except Exception as error:
+            yield error
+        else:
+            yield None
+
+
+HANDLERS = {
+    'send_mail': send_mail,
+    'purge': purge,
+}
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from tasks import queue
+
+
+class Command(BaseCommand):
+    help = 'Runs background tasks from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size',
+                            type=int,
+                            default=50,
+                            help='Tasks claimed at once',
+                            )
+        parser.add_argument('--sleep',
+                            type=float,
+                            default=1.0,
+                            help='Seconds to wait when the queue is empty',
+                            )
+        parser.add_argument('--once',
+                            action='store_true',
+                            help='Exit when no due tasks are left',
+                            )
+        parser.add_argument('--stats',
+                            action='store_true',
+                            help='Print queue metrics and exit',
+                            )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_stats()
+            return
+        try:
+            while True:
+                tasks = queue.claim(options['batch_size'])
+                if not tasks:
+                    if options['once']:
+                        return
+                    time.sleep(options['sleep'])
+                    continue
+                failed = queue.run(tasks)
+                self.stdout.write(
+                    f'Processed {len(tasks)} tasks, {failed} failed')
+                self.write_stats()
+        except KeyboardInterrupt:
+            return
+
+    def write_stats(self):
+        self.stdout.write(' '.join(
+            f'{key}={value:g}' for key, value in queue.stats().items()))
@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .enums import Status
+
+
+class Task(models.Model):
+    """Background job, written in the transaction of the request."""
+
+    name = models.CharField(_('Задача'), max_length=100)
+    payload = models.TextField(_('Параметры'), default='{}')
+    status = models.CharField(
+        _('Статус'),
+        max_length=10,
+        choices=Status.choices(),
+        default=Status.pending.name
+    )
+    attempts = models.PositiveIntegerField(_('Попытки'), default=0)
+    run_at = models.DateTimeField(_('Запуск не раньше'), default=timezone.now)
+    created_at = models.DateTimeField(_('Создана'), auto_now_add=True)
+    locked_by = models.CharField(max_length=32, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(_('Завершена'), null=True, blank=True)
+    last_error = models.TextField(_('Последняя ошибка'), blank=True)
+
+    class Meta:
+        verbose_name = _('Задача')
+        verbose_name_plural = _('Задачи')
+        indexes = [
+            models.Index(fields=['status', 'run_at'],
+                         name='task_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,136 @@
+import json
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from .enums import Status
+from .handlers import HANDLERS
+from .models import Task
+
+LOST_ERROR = 'The worker stopped while running the task'
+
+
+def enqueue(name, **payload):
+    """Add a task, use inside the transaction of the data it sends."""
+    if name not in HANDLERS:
+        raise ValueError(f'Unknown task {name}')
+    return Task.objects.create(name=name, payload=json.dumps(payload))
+
+
+def claim(batch_size):
+    """Lock up to batch_size due tasks for this worker.
+
+    Rows are picked with SELECT ... FOR UPDATE SKIP LOCKED where the
+    database supports it. The conditional UPDATE re-checks the state, so
+    on SQLite, which serializes writers, a task is never claimed twice.
+    Running tasks whose worker died are picked up again after
+    TASKS_LOCK_TIMEOUT seconds. That counts as a failed attempt, so a
+    task that keeps killing its worker ends up failed.
+    """
+    now = timezone.now()
+    lost = Q(
+        status=Status.running.name,
+        locked_at__lt=now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT))
+    due = Q(status=Status.pending.name, run_at__lte=now) | lost
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        ids = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(due).order_by('run_at').values_list('pk', flat=True)
+            [:batch_size]
+        )
+        Task.objects.filter(lost, pk__in=ids).update(
+            attempts=F('attempts') + 1, last_error=LOST_ERROR)
+        Task.objects.filter(
+            lost, pk__in=ids, attempts__gte=settings.TASKS_MAX_ATTEMPTS
+        ).update(status=Status.failed.name, locked_by='')
+        Task.objects.filter(due, pk__in=ids).update(
+            status=Status.running.name, locked_by=token, locked_at=now)
+    return list(Task.objects.filter(locked_by=token).order_by('run_at'))
+
+
+def run(tasks):
+    """Run claimed tasks, grouped by name, and record the outcome.
+
+    The outcome of a task is written as soon as the handler yields it,
+    so a handler failing halfway, or a worker stopping, does not repeat
+    the tasks that are already done, such as mails already sent.
+    """
+    groups = {}
+    for task in tasks:
+        groups.setdefault(task.name, []).append(task)
+    failed = 0
+    for name, group in groups.items():
+        handler = HANDLERS.get(name)
+        if handler is None:
+            errors = [f'Unknown task {name}'] * len(group)
+        else:
+            errors = handler([json.loads(task.payload) for task in group])
+        remaining = iter(group)
+        try:
+            # The handler goes first, a task is taken once it yielded.
+            for error, task in zip(errors, remaining):
+                failed += record(task, error)
+        except Exception as error:
+            for task in remaining:
+                failed += record(task, error)
+    return failed
+
+
+def record(task, error):
+    """Finish or retry the task, return 1 if it failed."""
+    if error is None:
+        finish(task)
+        return 0
+    retry(task, error)
+    return 1
+
+
+def finish(task):
+    Task.objects.filter(pk=task.pk).update(
+        status=Status.done.name, finished_at=timezone.now(), locked_by='')
+
+
+def retry(task, error):
+    """Schedule the task again with exponential backoff."""
+    attempts = task.attempts + 1
+    if attempts >= settings.TASKS_MAX_ATTEMPTS:
+        status, run_at = Status.failed.name, task.run_at
+    else:
+        status = Status.pending.name
+        run_at = timezone.now() + timedelta(
+            seconds=settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1))
+    Task.objects.filter(pk=task.pk).update(
+        status=status, attempts=attempts, run_at=run_at, locked_by='',
+        last_error=str(error))
+
+
+def stats(latency_sample=1000):
+    """Queue depth per status, age of the oldest pending task and latency
+    percentiles (created to finished, seconds) of the last done tasks."""
+    counts = dict(
+        Task.objects.order_by().values_list('status')
+        .annotate(total=Count('pk'))
+    )
+    oldest = Task.objects.filter(status=Status.pending.name).aggregate(
+        oldest=Min('created_at'))['oldest']
+    latencies = sorted(
+        (finished - created).total_seconds()
+        for created, finished in Task.objects.filter(
+            status=Status.done.name).order_by('-finished_at')
+        .values_list('created_at', 'finished_at')[:latency_sample]
+    )
+    result = {
+        status.name: counts.get(status.name, 0) for status in Status
+    }
+    result['oldest_pending_age'] = (
+        (timezone.now() - oldest).total_seconds() if oldest else 0)
+    for percent in (50, 95, 99):
+        result[f'latency_p{percent}'] = (
+            latencies[int(len(latencies) * percent / 100 - 1e-9)]
+            if latencies else 0)
+    return result
@@ -1,3 +1,4 @@
+from api.counts import ApproximateCountPaginator
 from django.contrib import admin
 
 from .models import CustomUser
@@ -13,6 +14,8 @@ class CustomUserAdmin(admin.ModelAdmin):
         'is_staff',
     )
     ordering = ('username',)
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(CustomUser, CustomUserAdmin)
@@ -0,0 +1,96 @@
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import user_cache
+from .enums import Role
+from .models import CustomUser
+
+
+def load_user(user_id, fresh=False):
+    try:
+        return user_cache.get(user_id, fresh)
+    except CustomUser.DoesNotExist:
+        # Deleted after the token was issued.
+        raise AuthenticationFailed(
+            _('User not found'), code='user_not_found')
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """User backed by the claims of a role-carrying token.
+
+    Identity and moderator checks read the claims. The admin check reads
+    the user from the database, anything else loads the CustomUser
+    through the user cache on first access.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: load_user(user_id))
+        self.__dict__['claims'] = token
+
+    @property
+    def pk(self):
+        return self.__dict__['claims'][api_settings.USER_ID_CLAIM]
+
+    id = pk
+
+    @property
+    def role(self):
+        return self.__dict__['claims']['role']
+
+    @property
+    def is_active(self):
+        return self.__dict__['claims']['is_active']
+
+    @property
+    def is_moderator(self):
+        return self.role == Role.moderator.name
+
+    @property
+    def is_admin(self):
+        # Admin reads expose every user's data, so a demoted, deactivated
+        # or deleted admin loses them without waiting for the token to
+        # expire, or for the cache of this process to notice.
+        if self.role != Role.admin.name:
+            return False
+        user = load_user(self.pk, fresh=True)
+        return user.is_active and user.is_admin
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication without a user query per request.
+
+    Safe requests with a role-carrying token get a TokenClaimsUser, and
+    tokens issued before roles were embedded get the user from the
+    per-process cache. Unsafe requests read the user from the database,
+    the cache may hold a row changed by another process. A changed role
+    applies to writes and admin-only reads at once, and to other reads
+    with the next token.
+    """
+
+    def authenticate(self, request):
+        self.safe = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.safe and 'role' in validated_token:
+            if not validated_token.get('is_active'):
+                raise AuthenticationFailed(
+                    _('User is inactive'), code='user_inactive')
+            return TokenClaimsUser(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+        user = load_user(user_id, fresh=not self.safe)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return user
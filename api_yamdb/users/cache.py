@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import CustomUser
+
+FIELD_NAMES = [field.attname for field in CustomUser._meta.concrete_fields]
+
+
+class UserCache:
+    """Per-process LRU cache of user rows with a time to live.
+
+    Rows are cached rather than instances, so every caller gets its own
+    CustomUser object and no request can change another one's user.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.rows = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, fresh=False):
+        """Return the user, raises CustomUser.DoesNotExist.
+
+        ``fresh`` reads the row from the database and caches it again,
+        for callers that can't act on a row another process changed.
+        """
+        now = time.monotonic()
+        with self.lock:
+            expires, values = self.rows.get(user_id, (0, None))
+            if expires > now and not fresh:
+                self.rows.move_to_end(user_id)
+            else:
+                values = None
+        if values is None:
+            values = CustomUser.objects.values_list(*FIELD_NAMES).get(
+                pk=user_id)
+            with self.lock:
+                self.rows[user_id] = (now + self.ttl, values)
+                self.rows.move_to_end(user_id)
+                while len(self.rows) > self.size:
+                    self.rows.popitem(last=False)
+        return CustomUser.from_db(DEFAULT_DB_ALIAS, FIELD_NAMES, values)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.rows.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.rows.clear()
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
@@ -0,0 +1,119 @@
+from django.conf import settings
+from django.db import models, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from tasks.queue import enqueue
+
+# Sent inside the transaction of every chunk, before its rows are gone.
+pre_purge_chunk = Signal(providing_args=['ids', 'using'])
+# Sent with the rows that lost a reference to a purged object.
+post_purge_detach = Signal(providing_args=['field', 'ids', 'using'])
+# Sent inside the transaction of a soft delete, once the object is hidden.
+post_soft_delete = Signal(providing_args=['instance', 'using'])
+
+
+class SoftDeleteManager(models.Manager):
+    """Leave out objects waiting for the purge."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class SoftDeleteModel(models.Model):
+    """Model deleted in two steps: hidden now, removed by the worker.
+
+    ``objects`` and the related managers skip deleted objects,
+    ``all_objects`` sees every row.
+    """
+
+    deleted_at = models.DateTimeField(
+        _('Удалено'), null=True, blank=True, editable=False)
+
+    objects = SoftDeleteManager()
+    all_objects = models.Manager()
+
+    # Unique fields a deleted object gives up at once, so their values
+    # can be taken again before the purge.
+    released_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def soft_delete(self):
+        """Hide the object and leave its removal to the purge task.
+
+        References the purge would set to NULL are cleared right away,
+        so no other object shows the deleted one in the meantime.
+        """
+        using = self._state.db
+        with transaction.atomic(using=using):
+            self.deleted_at = timezone.now()
+            for name in self.released_fields:
+                # Slugs and emails can't hold a colon, usernames are
+                # checked for uniqueness against deleted rows as well.
+                setattr(self, name, f'deleted:{self.pk}')
+            self.save(update_fields=['deleted_at', *self.released_fields])
+            for relation in dependent_relations(type(self)):
+                if relation.on_delete is models.SET_NULL:
+                    follow(relation, [self.pk], using)
+            post_soft_delete.send(
+                sender=type(self), instance=self, using=using)
+            enqueue('purge', model=self._meta.label_lower, pk=self.pk)
+
+    @classmethod
+    def purge(cls, pk):
+        purge_rows(cls, {'pk': pk, 'deleted_at__isnull': False})
+
+
+def dependent_relations(model):
+    """Reverse foreign keys the deletion of the model has to follow."""
+    return [
+        relation for relation in model._meta.get_fields(include_hidden=True)
+        if relation.auto_created and not relation.concrete
+        and (relation.one_to_many or relation.one_to_one)
+    ]
+
+
+def purge_rows(model, filters, using='default'):
+    """Delete the matching rows and their dependents chunk by chunk.
+
+    Unlike ``QuerySet.delete()``, which collects the whole subtree in
+    memory and deletes it in one transaction, only the ids of one chunk
+    are held and every chunk is a short transaction of its own. Children
+    go first, so a failed purge leaves no dangling rows and is simply
+    run again. Deleted rows get no ``post_delete``, receivers that keep
+    derived data listen to ``pre_purge_chunk`` instead.
+    """
+    size = settings.PURGE_CHUNK_SIZE
+    manager = model._base_manager.db_manager(using)
+    rows = manager.filter(**filters).order_by().values_list('pk', flat=True)
+    while True:
+        ids = list(rows[:size])
+        if not ids:
+            return
+        for relation in dependent_relations(model):
+            follow(relation, ids, using)
+        with transaction.atomic(using=using):
+            pre_purge_chunk.send(sender=model, ids=ids, using=using)
+            manager.filter(pk__in=ids)._raw_delete(using)
+
+
+def follow(relation, ids, using):
+    lookup = {f'{relation.field.name}__in': ids}
+    if relation.on_delete is models.CASCADE:
+        purge_rows(relation.related_model, lookup, using)
+    elif relation.on_delete is models.SET_NULL:
+        manager = relation.related_model._base_manager.db_manager(using)
+        rows = manager.filter(**lookup).order_by().values_list(
+            'pk', flat=True)
+        while True:
+            chunk = list(rows[:settings.PURGE_CHUNK_SIZE])
+            if not chunk:
+                return
+            with transaction.atomic(using=using):
+                manager.filter(pk__in=chunk).update(
+                    **{relation.field.name: None})
+                post_purge_detach.send(
+                    sender=relation.related_model, field=relation.field,
+                    ids=chunk, using=using)
@@ -1,9 +1,10 @@
 from django.contrib.auth.models import BaseUserManager
 
+from .deletion import SoftDeleteManager
 from .enums import Role
 
 
-class CustomUserManager(BaseUserManager):
+class CustomUserManager(SoftDeleteManager, BaseUserManager):
     """Class Custom manager."""
 
     def create_user(self, email, username, password=None, **args):
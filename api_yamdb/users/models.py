@@ -3,11 +3,12 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .deletion import SoftDeleteModel
 from .enums import Role
 from .managers import CustomUserManager
 
 
-class CustomUser(AbstractBaseUser, PermissionsMixin):
+class CustomUser(SoftDeleteModel, AbstractBaseUser, PermissionsMixin):
     """Class CustomUser."""
 
     username = models.CharField(_('username'), max_length=150, unique=True)
@@ -29,6 +30,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     REQUIRED_FIELDS = ['email']
 
     objects = CustomUserManager()
+    all_objects = models.Manager()
+    released_fields = ('username', 'email')
 
     class Meta:
         verbose_name = _('Пользователь')
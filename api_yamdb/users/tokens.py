@@ -0,0 +1,12 @@
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class RoleAccessToken(AccessToken):
+    """Access token that carries the role and state of the user."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['is_active'] = user.is_active
+        return token
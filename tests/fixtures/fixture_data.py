@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+
+    return Category.objects.create(name='Фильм', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+
+    title = Title.objects.create(
+        name='Чапаев', year=1934, description='', category=category)
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture
+def review(title, user):
+    from reviews.models import Review
+
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7)
@@ -0,0 +1,44 @@
+import pytest
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='TestAdmin', email='admin@yamdb.fake', role='admin')
+
+
+@pytest.fixture
+def moderator(django_user_model):
+    return django_user_model.objects.create(
+        username='TestModerator', email='moderator@yamdb.fake',
+        role='moderator')
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create(
+        username='TestUser', email='user@yamdb.fake', role='user')
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create(
+        username='TestUserAnother', email='another@yamdb.fake', role='user')
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def user_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
@@ -0,0 +1,125 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    from users.cache import user_cache
+
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def get_token(client, user):
+    from django.contrib.auth.tokens import default_token_generator
+
+    response = client.post('/api/v1/auth/token/', {
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == 201
+    return response.json()['token']
+
+
+def token_client(token):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class TestClaimsAuthentication:
+
+    def test_token_carries_role(self, client, admin):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        token = AccessToken(get_token(client, admin))
+        assert token['role'] == 'admin' and token['is_active'] is True
+
+    def test_reads_cost_no_auth_queries(
+            self, client, admin, django_assert_num_queries):
+        admin_client = token_client(get_token(client, admin))
+        admin_client.get('/api/v1/users/me/')
+        with django_assert_num_queries(0):
+            response = admin_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        # count and page of the users list and the admin check
+        with django_assert_num_queries(3):
+            response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 200
+
+    def test_me_uses_user_cache(
+            self, client, user, django_assert_num_queries):
+        user_client = token_client(get_token(client, user))
+        assert user_client.get('/api/v1/users/me/').json()['username'] == (
+            'TestUser')
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.json()['role'] == 'user'
+
+    def test_profile_change_invalidates_cache(self, client, user):
+        user_client = token_client(get_token(client, user))
+        user_client.get('/api/v1/users/me/')
+        response = user_client.patch(
+            '/api/v1/users/me/', {'bio': 'Новое'}, format='json')
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/me/').json()['bio'] == 'Новое'
+
+    def test_writes_check_current_role(self, client, admin):
+        demoted = token_client(get_token(client, admin))
+        admin.role = 'user'
+        admin.save()
+        response = demoted.post(
+            '/api/v1/categories/', {'name': 'Книга', 'slug': 'book'})
+        assert response.status_code == 403, (
+            'Проверьте, что запись проверяет роль пользователя из базы'
+        )
+
+    def test_inactive_user_is_rejected(self, client, user):
+        token = get_token(client, user)
+        user.is_active = False
+        user.save()
+        response = token_client(token).patch(
+            '/api/v1/users/me/', {'bio': ''}, format='json')
+        assert response.status_code == 401
+
+    def test_demoted_admin_loses_admin_reads(self, client, admin, user):
+        admin_client = token_client(get_token(client, admin))
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.is_active = False
+        admin.save()
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code in (401, 403), (
+            'Проверьте, что чтение для администраторов проверяет текущую '
+            'роль пользователя'
+        )
+        response = admin_client.get('/api/v1/autocomplete/?q=test')
+        assert 'users' not in response.json()
+
+    def test_deleted_admin_loses_admin_reads(self, client, admin):
+        admin_client = token_client(get_token(client, admin))
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.soft_delete()
+        assert admin_client.get('/api/v1/users/').status_code == 401
+
+    def test_role_changed_by_another_process(self, client, admin):
+        from users.models import CustomUser
+
+        admin_client = token_client(get_token(client, admin))
+        assert admin_client.get('/api/v1/users/me/').status_code == 200
+        # A queryset update sends no signal, like a write of another
+        # process it leaves the cache of this one as it is.
+        CustomUser.objects.filter(pk=admin.pk).update(role='user')
+        assert admin_client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что права администратора проверяются по базе'
+        )
+        response = admin_client.patch(
+            '/api/v1/users/me/', {'bio': 'Новое'}, format='json')
+        assert response.status_code == 200
+        admin.refresh_from_db()
+        assert (admin.role, admin.bio) == ('user', 'Новое'), (
+            'Проверьте, что изменение профиля не возвращает старую роль'
+        )
@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def readers(django_user_model):
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'reader{i}', email=f'r{i}@yamdb.fake')
+        for i in range(100)
+    )
+    return list(django_user_model.objects.filter(username__startswith='r'))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAuthorQueries:
+
+    def test_review_list_query_count(
+            self, client, title, readers, django_assert_num_queries):
+        from reviews.models import Review
+
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='', score=5)
+            for author in readers
+        )
+        # bulk_create() skips the receivers that keep the counters.
+        call_command('rebuild_counters')
+        # title with its review count, page with authors
+        with django_assert_num_queries(2):
+            response = client.get(
+                f'/api/v1/titles/{title.id}/reviews/?limit=100')
+        results = response.json()['results']
+        assert len(results) == 100
+        assert {item['author'] for item in results} == {
+            reader.username for reader in readers}
+
+    def test_comment_list_query_count(
+            self, client, title, review, readers, django_assert_num_queries):
+        from reviews.models import Comment
+
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='')
+            for author in readers
+        )
+        # bulk_create() skips the receivers that keep the counters.
+        call_command('rebuild_counters')
+        # review with title and comment count, page with authors
+        with django_assert_num_queries(2):
+            response = client.get(
+                f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+                f'?limit=100')
+        assert len(response.json()['results']) == 100
+
+    def test_owner_check_does_not_load_author(self, user_client, title,
+                                              review):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.patch(
+                f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+                {'text': 'Изменено'}, format='json')
+        assert response.status_code == 200
+        assert response.json()['author'] == 'TestUser'
+        lookups = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "users_customuser"' in query['sql']
+        ]
+        assert not lookups, (
+            'Проверьте, что автор отзыва загружается вместе с отзывом'
+        )
+
+    def test_foreign_review_is_protected(
+            self, title, review, another_user):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=another_user)
+        response = client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            {'text': 'Чужое'}, format='json')
+        assert response.status_code == 403
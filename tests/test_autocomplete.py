@@ -0,0 +1,93 @@
+import pytest
+
+URL = '/api/v1/autocomplete/'
+
+
+@pytest.fixture(autouse=True)
+def clear_autocomplete():
+    from api.autocomplete import autocomplete
+
+    autocomplete.clear()
+    yield
+    autocomplete.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAutocomplete:
+
+    def test_prefix_matches(self, client, title, user):
+        from reviews.models import Title
+
+        seagull = Title.objects.create(
+            name='чайка', year=1970, description='')
+        response = client.get(f'{URL}?q=Ча')
+        assert response.status_code == 200
+        assert response.json() == {
+            'titles': [{'id': seagull.pk, 'name': 'чайка'},
+                       {'id': title.pk, 'name': 'Чапаев'}],
+            'genres': [],
+            'categories': [],
+        }, 'Проверьте, что поиск идет по началу названия без учета регистра'
+        data = client.get(f'{URL}?q=ко').json()
+        assert data['genres'] == [{'slug': 'comedy', 'name': 'Комедия'}]
+        data = client.get(f'{URL}?q=ФИЛ').json()
+        assert data['categories'] == [{'slug': 'movie', 'name': 'Фильм'}]
+        assert client.get(f'{URL}?q=пае').json()['titles'] == []
+
+    def test_users_for_admins_only(self, client, user_client, admin_client,
+                                   user, another_user):
+        for reader in (client, user_client):
+            assert 'users' not in reader.get(f'{URL}?q=test').json(), (
+                'Проверьте, что пользователей ищут только администраторы'
+            )
+        response = admin_client.get(f'{URL}?q=testuser')
+        assert response.json()['users'] == [
+            {'username': 'TestUser'}, {'username': 'TestUserAnother'}]
+
+    def test_lookup_without_queries(
+            self, client, title, django_assert_num_queries):
+        client.get(f'{URL}?q=ч')
+        with django_assert_num_queries(0):
+            response = client.get(f'{URL}?q=ч')
+        assert response.json()['titles'][0]['name'] == 'Чапаев', (
+            'Проверьте, что подсказки берутся из индекса в памяти'
+        )
+
+    def test_index_follows_changes(
+            self, admin_client, client, title, django_assert_num_queries):
+        client.get(f'{URL}?q=ч')
+        url = f'/api/v1/titles/{title.pk}/'
+        admin_client.patch(url, {'name': 'Броненосец'})
+        with django_assert_num_queries(0):
+            response = client.get(f'{URL}?q=бр')
+        assert response.json()['titles'] == [
+            {'id': title.pk, 'name': 'Броненосец'}]
+        assert client.get(f'{URL}?q=ч').json()['titles'] == [], (
+            'Проверьте, что индекс обновляется при изменении названия'
+        )
+        assert admin_client.delete(url).status_code == 204
+        assert client.get(f'{URL}?q=бр').json()['titles'] == []
+
+    def test_changes_of_other_processes(self, settings, client, title):
+        from api.cache import bump_version
+        from reviews.models import Title
+
+        client.get(f'{URL}?q=ч')
+        Title.objects.bulk_create(
+            [Title(name='Чародеи', year=1982, description='')])
+        bump_version(Title)
+        assert len(client.get(f'{URL}?q=ч').json()['titles']) == 1
+        settings.AUTOCOMPLETE_REFRESH = 0
+        assert len(client.get(f'{URL}?q=ч').json()['titles']) == 2, (
+            'Проверьте, что индекс перестраивается по версии в кэше'
+        )
+
+    def test_query_validation(self, client, title):
+        from reviews.models import Title
+
+        for query in ('', '?q=', '?q=%20', '?q=ч&limit=0', '?q=ч&limit=51'):
+            assert client.get(f'{URL}{query}').status_code == 400
+        Title.objects.create(name='Чародеи', year=1982, description='')
+        response = client.get(f'{URL}?q=ч&limit=1')
+        assert response.json()['titles'] == [
+            {'id': title.pk, 'name': 'Чапаев'}]
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+def result(p95=10.0, throughput=100.0, queries=3.0, errors=0):
+    return {'requests': 100, 'throughput': throughput, 'errors': errors,
+            'p50': p95 / 2, 'p95': p95, 'p99': p95 * 2, 'queries': queries}
+
+
+class TestBaselineComparison:
+
+    def test_within_threshold(self):
+        from api.management.commands.bench_api import compare
+
+        baseline = {'titles-list': result()}
+        assert compare({'titles-list': result(p95=11.9, throughput=81)},
+                       baseline, 0.2) == []
+
+    @pytest.mark.parametrize('changed', [
+        {'p95': 12.5}, {'throughput': 79.0}, {'queries': 4.0},
+        {'errors': 1},
+    ])
+    def test_regressions(self, changed):
+        from api.management.commands.bench_api import compare
+
+        regressions = compare(
+            {'titles-list': result(**changed)},
+            {'titles-list': result()}, 0.2)
+        assert len(regressions) == 1, (
+            'Проверьте, что ухудшение относительно базовой линии замечено'
+        )
+        assert regressions[0].startswith('titles-list: ')
+
+    def test_missing_route(self):
+        from api.management.commands.bench_api import compare
+
+        assert compare({}, {'titles-list': result()}, 0.2) == [
+            'titles-list: not measured']
+
+
+class TestMix:
+
+    def test_every_route_is_driven(self):
+        from api.management.commands.bench_api import MIX, Scenario
+        from api.urls import router
+
+        names = {name for name, _, _ in MIX}
+        routes = {
+            f'{basename}-{action}' for _, _, basename in router.registry
+            for action in ('list', 'create', 'delete')
+        }
+        assert routes <= names, (
+            'Проверьте, что сценарий нагрузки проходит по всем маршрутам'
+        )
+        assert {'users-me-update', 'autocomplete', 'auth-signup',
+                'auth-token'} <= names
+        assert all(hasattr(Scenario, builder) for _, _, builder in MIX)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchApi:
+
+    def test_drives_routes_and_saves_baseline(self, live_server, tmp_path):
+        # One client: concurrent writes lock the shared in-memory SQLite.
+        path = tmp_path / 'baseline.json'
+        call_command(
+            'bench_api', url=live_server.url, clients=1, duration=1,
+            titles=5, genres=3, categories=2, reviews_per_title=2,
+            comments_per_review=1, save_baseline=str(path))
+        results = json.loads(path.read_text())
+        assert 'titles-list' in results
+        # The page and its genres, the count is cached after the first.
+        assert 2 <= results['titles-list']['queries'] < 3
+        assert all(route['errors'] == 0 for route in results.values()), (
+            'Проверьте, что все запросы нагрузочного сценария успешны'
+        )
+
+    def test_fails_on_regression(self, live_server, tmp_path):
+        path = tmp_path / 'baseline.json'
+        path.write_text(json.dumps({'titles-list': result(
+            p95=0.001, throughput=10 ** 6, queries=0)}))
+        with pytest.raises(CommandError, match='titles-list'):
+            call_command(
+                'bench_api', url=live_server.url, clients=1, duration=0.5,
+                titles=3, genres=2, categories=1, reviews_per_title=1,
+                comments_per_review=1, baseline=str(path))
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedLists:
+
+    @pytest.mark.parametrize('url', ['/api/v1/categories/',
+                                     '/api/v1/genres/'])
+    def test_second_request_is_cached(
+            self, client, category, genres, url, django_assert_num_queries):
+        first = client.get(url)
+        assert first.status_code == 200
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.json() == first.json()
+        assert second['ETag'] == first['ETag']
+
+    def test_if_none_match(self, client, category, django_assert_num_queries):
+        etag = client.get('/api/v1/categories/')['ETag']
+        with django_assert_num_queries(0):
+            response = client.get(
+                '/api/v1/categories/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается 304'
+        )
+
+    def test_query_string_is_part_of_key(self, client, genres):
+        drama = client.get('/api/v1/genres/?search=Драма').json()
+        assert [genre['slug'] for genre in drama['results']] == ['drama']
+        assert client.get('/api/v1/genres/').json()['count'] == 2
+
+    def test_writes_invalidate(self, client, admin_client, category):
+        etag = client.get('/api/v1/categories/')['ETag']
+        response = admin_client.post(
+            '/api/v1/categories/', {'name': 'Книга', 'slug': 'book'})
+        assert response.status_code == 201
+        response = client.get('/api/v1/categories/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что создание категории сбрасывает кэш списка'
+        )
+        assert response.json()['count'] == 2
+        admin_client.delete('/api/v1/categories/book/')
+        assert client.get('/api/v1/categories/').json()['count'] == 1
+
+    def test_version_moves_on_commit(self, category):
+        from django.db import transaction
+
+        from api.cache import get_version
+        from reviews.models import Category
+
+        before = get_version(Category)
+        with transaction.atomic():
+            Category.objects.create(name='Книга', slug='book')
+            assert get_version(Category) == before, (
+                'Проверьте, что версия меняется только после коммита'
+            )
+        assert get_version(Category) != before
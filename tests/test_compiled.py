@@ -0,0 +1,96 @@
+import pytest
+
+
+@pytest.fixture
+def catalog(category, genres, title, review, user, another_user):
+    from reviews.models import Category, Comment, Review, Title
+
+    book = Category.objects.create(name='Книга', slug='book')
+    other = Title.objects.create(
+        name='Другая категория', year=1999, description='Ёж', category=book)
+    other.genre.set(genres[:1])
+    Title.objects.create(name='Без жанров', year=2001, description='',
+                         category=category)
+    Review.objects.create(
+        title=title, author=another_user, text='Второй', score=3)
+    Comment.objects.create(review=review, author=user, text='"Кавычки"')
+    Comment.objects.create(review=review, author=another_user, text='\n')
+    return title, review
+
+
+def fetch_both(client, settings, url):
+    settings.COMPILED_SERIALIZERS = False
+    expected = client.get(url)
+    settings.COMPILED_SERIALIZERS = True
+    response = client.get(url)
+    assert response.status_code == expected.status_code == 200
+    return expected.content, response.content
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCompiledSerializers:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?limit=2&offset=1',
+        '/api/v1/titles/?name=кат',
+        '/api/v1/titles/?genre=drama',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/?cursor=&limit=1',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+    ])
+    def test_same_json(self, client, settings, catalog, url):
+        title, review = catalog
+        url = url.format(title=title.id, review=review.id)
+        expected, content = fetch_both(client, settings, url)
+        assert content == expected, (
+            'Проверьте, что быстрый путь сериализации отдаёт тот же JSON'
+        )
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/genres/', '/api/v1/categories/?search=Фильм'])
+    def test_same_json_cached_lists(self, client, settings, catalog, url):
+        from django.core.cache import cache
+
+        cache.clear()
+        settings.COMPILED_SERIALIZERS = False
+        expected = client.get(url).content
+        cache.clear()
+        settings.COMPILED_SERIALIZERS = True
+        assert client.get(url).content == expected
+
+    def test_same_json_streamed(self, client, settings, catalog):
+        settings.STREAMING_LIST_THRESHOLD = 2
+        settings.STREAMING_CHUNK_SIZE = 2
+        settings.COMPILED_SERIALIZERS = False
+        expected = b''.join(
+            client.get('/api/v1/titles/?limit=3').streaming_content)
+        settings.COMPILED_SERIALIZERS = True
+        content = b''.join(
+            client.get('/api/v1/titles/?limit=3').streaming_content)
+        assert content == expected
+
+    def test_unsupported_serializer_falls_back(self):
+        from rest_framework import serializers
+        from reviews.models import Title
+
+        from api.compiled import compile_serializer
+        from api.serializers import (
+            CategorySerializer, CommentSerializer, GenreSerializer,
+            ReviewSerializer, TitleSerializer)
+
+        class ComputedSerializer(serializers.ModelSerializer):
+            upper = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Title
+                fields = ('id', 'upper')
+
+            def get_upper(self, obj):
+                return obj.name.upper()
+
+        assert compile_serializer(ComputedSerializer) is None
+        for serializer_class in (
+                CategorySerializer, CommentSerializer, GenreSerializer,
+                ReviewSerializer, TitleSerializer):
+            assert compile_serializer(serializer_class) is not None
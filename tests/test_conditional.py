@@ -0,0 +1,72 @@
+import pytest
+
+
+@pytest.fixture
+def urls(title, review):
+    return [
+        f'/api/v1/titles/{title.pk}/',
+        f'/api/v1/titles/{title.pk}/reviews/',
+        f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+        f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    def test_not_modified_costs_one_query(self, client, urls):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for url in urls:
+            first = client.get(url)
+            assert first.status_code == 200
+            assert first['ETag'] and first['Last-Modified'], (
+                'Проверьте, что ответ содержит ETag и Last-Modified'
+            )
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            assert response.status_code == 304, (
+                'Проверьте, что при совпадении ETag возвращается 304'
+            )
+            assert response['ETag'] == first['ETag']
+            assert len(context.captured_queries) <= 1, (
+                'Проверьте, что ответ 304 стоит не больше одного запроса'
+            )
+            assert '"id" =' in context.captured_queries[0]['sql']
+            response = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+            assert response.status_code == 304
+
+    def test_urls_get_own_etags(self, client, urls):
+        etags = {client.get(url)['ETag'] for url in urls}
+        etags.add(client.get(f'{urls[1]}?limit=1')['ETag'])
+        assert len(etags) == len(urls) + 1
+
+    def test_changes_invalidate(
+            self, client, user_client, admin_client, title, review, urls):
+        from reviews.models import Category, Comment
+
+        def etags():
+            return [client.get(url)['ETag'] for url in urls]
+
+        changes = [
+            lambda: user_client.post(urls[3], {'text': 'Новый'}),
+            lambda: user_client.patch(urls[2], {'text': 'Исправлено'}),
+            lambda: Comment.objects.first().delete(),
+            lambda: admin_client.patch(urls[0], {'name': 'Чапаев!'}),
+            lambda: Category.objects.filter(pk=title.category_id).first()
+            .save(),
+        ]
+        before = etags()
+        for change in changes:
+            change()
+            after = etags()
+            assert all(old != new for old, new in zip(before, after)), (
+                'Проверьте, что изменения произведения, отзывов и '
+                'комментариев меняют ETag'
+            )
+            before = after
+        response = client.get(urls[0], HTTP_IF_NONE_MATCH='"0-stale"')
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Чапаев!'
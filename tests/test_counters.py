@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCounters:
+
+    def test_counters_in_api(
+            self, client, user_client, admin_client, title, review):
+        from reviews.models import Comment
+
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        for text in ('Да', 'Нет'):
+            assert user_client.post(url, {'text': text}).status_code == 201
+        comment = Comment.objects.first()
+        assert admin_client.delete(f'{url}{comment.pk}/').status_code == 204
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.json()['results'][0]['comment_count'] == 1, (
+            'Проверьте, что у отзыва выводится число комментариев'
+        )
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['review_count'] == 1, (
+            'Проверьте, что у произведения выводится число отзывов'
+        )
+
+    def test_list_count_reads_counter(
+            self, client, title, review, django_assert_num_queries):
+        from reviews.models import Review
+
+        Review.objects.filter(pk=review.pk).update(comment_count=42)
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.json()['count'] == 42, (
+            'Проверьте, что count списка берется из счетчика'
+        )
+
+    def test_purged_author_leaves_counters(
+            self, admin_client, title, review, another_user):
+        from reviews.models import Comment
+
+        Comment.objects.create(review=review, author=another_user, text='a')
+        Comment.objects.create(review=review, author=review.author, text='b')
+        admin_client.delete(f'/api/v1/users/{another_user.username}/')
+        call_command('run_worker', once=True)
+        review.refresh_from_db()
+        assert review.comment_count == 1
+
+    def test_rebuild_counters(self, title, review):
+        from reviews.models import Comment, Review, Title
+
+        Comment.objects.create(review=review, author=review.author, text='a')
+        Review.objects.update(comment_count=5)
+        Title.objects.update(review_count=3, score_sum=0, rating=None)
+        call_command('rebuild_counters', chunk_size=1)
+        review.refresh_from_db()
+        title.refresh_from_db()
+        assert review.comment_count == 1, (
+            'Проверьте, что rebuild_counters пересчитывает комментарии'
+        )
+        assert (title.review_count, title.rating) == (1, 7)
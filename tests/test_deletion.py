@@ -0,0 +1,192 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def add_comments(review, author, count):
+    from reviews.models import Comment
+
+    for number in range(count):
+        Comment.objects.create(review=review, author=author, text=str(number))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSoftDelete:
+
+    def test_title_is_hidden_then_purged(
+            self, admin_client, client, title, review, user):
+        from reviews.models import Comment, Review, Title
+        from tasks.models import Task
+
+        add_comments(review, user, 3)
+        response = admin_client.delete(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 204
+        assert client.get(f'/api/v1/titles/{title.pk}/').status_code == 404
+        assert client.get('/api/v1/titles/').json()['count'] == 0, (
+            'Проверьте, что удаленное произведение сразу скрыто'
+        )
+        assert client.get(
+            f'/api/v1/titles/{title.pk}/reviews/').status_code == 404
+        assert Title.all_objects.filter(pk=title.pk).exists(), (
+            'Проверьте, что строки удаляются фоновой задачей'
+        )
+        assert Task.objects.get().name == 'purge'
+        call_command('run_worker', once=True)
+        assert Task.objects.get().status == 'done'
+        assert not Title.all_objects.exists()
+        assert not Review.all_objects.exists()
+        assert not Comment.objects.exists()
+
+    def test_purge_goes_in_chunks(self, settings, review, user):
+        from reviews.models import Comment
+
+        settings.PURGE_CHUNK_SIZE = 2
+        add_comments(review, user, 5)
+        review.soft_delete()
+        with CaptureQueriesContext(connection) as context:
+            call_command('run_worker', once=True)
+        deletes = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('DELETE')]
+        assert len(deletes) == 4, (
+            'Проверьте, что комментарии удаляются порциями '
+            'PURGE_CHUNK_SIZE, а отзыв после них'
+        )
+        assert not Comment.objects.exists()
+
+    def test_review_leaves_rating_at_once(
+            self, admin_client, title, review, another_user):
+        from reviews.models import Review
+
+        Review.objects.create(
+            title=title, author=another_user, text='b', score=3)
+        response = admin_client.delete(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/')
+        assert response.status_code == 204
+        title.refresh_from_db()
+        assert (title.rating, title.review_count) == (3, 1), (
+            'Проверьте, что удаленный отзыв сразу не учитывается в рейтинге'
+        )
+        call_command('run_worker', once=True)
+        title.refresh_from_db()
+        assert (title.rating, title.review_count) == (3, 1)
+
+    def test_deleted_review_blocks_new_one_until_purged(
+            self, user_client, title, review):
+        review.soft_delete()
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        data = {'text': 'Снова', 'score': 5}
+        assert user_client.post(url, data).status_code == 400
+        call_command('run_worker', once=True)
+        assert user_client.post(url, data).status_code == 201
+
+    def test_category_titles_stay(self, admin_client, client, title):
+        response = admin_client.delete('/api/v1/categories/movie/')
+        assert response.status_code == 204
+        assert client.get('/api/v1/categories/').json()['count'] == 0
+        title.refresh_from_db()
+        assert title.category_id is None, (
+            'Проверьте, что произведения удаленной категории сразу '
+            'остаются без категории'
+        )
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['category'] is None
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['category'] is None
+        response = client.get('/api/v1/titles/?category=movie')
+        assert response.json()['count'] == 0
+        assert admin_client.post(
+            '/api/v1/categories/', {'name': 'Кино', 'slug': 'movie'}
+        ).status_code == 201, (
+            'Проверьте, что slug удаленной категории сразу свободен'
+        )
+        call_command('run_worker', once=True)
+        title.refresh_from_db()
+        assert title.category_id is None
+        assert client.get('/api/v1/categories/').json()['count'] == 1
+
+    def test_comments_of_deleted_title_are_gone(
+            self, admin_client, user_client, title, review):
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        assert user_client.get(url).status_code == 200
+        admin_client.delete(f'/api/v1/titles/{title.pk}/')
+        assert user_client.get(url).status_code == 404, (
+            'Проверьте, что комментарии удаленного произведения скрыты'
+        )
+        assert user_client.post(url, {'text': 'Текст'}).status_code == 404
+
+    def test_generated_ids_skip_deleted_rows(self, title):
+        from reviews.models import Title
+
+        title.soft_delete()
+        call_command('generate_data', users=1, titles=1, reviews=0,
+                     comments=0, genres=1, categories=1, stdout=StringIO())
+        assert Title.objects.get().pk == title.pk + 1, (
+            'Проверьте, что новые id не совпадают с id удаленных строк'
+        )
+
+    def test_genre_leaves_titles_at_once(self, admin_client, client, title):
+        from reviews.models import GenreTitle
+
+        response = admin_client.delete('/api/v1/genres/drama/')
+        assert response.status_code == 204
+        genres = client.get(f'/api/v1/titles/{title.pk}/').json()['genre']
+        assert [genre['slug'] for genre in genres] == ['comedy']
+        call_command('run_worker', once=True)
+        assert GenreTitle.objects.count() == 1
+
+    def test_user_is_purged_with_reviews(
+            self, admin_client, client, title, review, another_user):
+        from reviews.models import Review
+        from users.models import CustomUser
+        from users.tokens import RoleAccessToken
+
+        client.defaults['HTTP_AUTHORIZATION'] = (
+            f'Bearer {RoleAccessToken.for_user(review.author)}')
+        other = Review.objects.create(
+            title=title, author=another_user, text='b', score=3)
+        add_comments(other, review.author, 2)
+        add_comments(other, another_user, 1)
+        response = admin_client.delete(f'/api/v1/users/{review.author}/')
+        assert response.status_code == 204
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что удаленный пользователь не может войти'
+        )
+        reviews_url = f'/api/v1/titles/{title.pk}/reviews/'
+        comments_url = f'{reviews_url}{other.pk}/comments/'
+        for _ in range(2):
+            title.refresh_from_db()
+            other.refresh_from_db()
+            assert (title.rating, title.review_count) == (3, 1), (
+                'Проверьте, что отзывы удаленного пользователя сразу не '
+                'учитываются в рейтинге'
+            )
+            assert other.comment_count == 1
+            response = admin_client.get(reviews_url).json()
+            assert [item['id'] for item in response['results']] == [
+                other.pk]
+            response = admin_client.get(comments_url).json()
+            assert response['count'] == 1
+            assert [item['author'] for item in response['results']] == [
+                'TestUserAnother']
+            call_command('run_worker', once=True)
+        assert not CustomUser.all_objects.filter(pk=review.author_id).exists()
+        assert not Review.all_objects.filter(pk=review.pk).exists()
+
+    def test_user_name_is_free_at_once(self, admin_client, client, user):
+        from users.models import CustomUser
+
+        user.soft_delete()
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'TestUser', 'email': 'user@yamdb.fake'})
+        assert response.status_code == 200, (
+            'Проверьте, что имя и почта удаленного пользователя сразу '
+            'свободны'
+        )
+        response = admin_client.post('/api/v1/users/', {
+            'username': f'deleted:{user.pk}', 'email': 'x@yamdb.fake'})
+        assert response.status_code == 400
+        call_command('run_worker', once=True)
+        assert CustomUser.objects.get(username='TestUser').pk != user.pk
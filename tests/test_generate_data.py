@@ -0,0 +1,100 @@
+import pytest
+from django.core.management import call_command
+
+
+class TestZipfCounts:
+
+    def test_counts_add_up_and_skew(self):
+        from reviews.management.commands.generate_data import zipf_counts
+
+        counts = zipf_counts(1000, 100, 1.1, cap=500)
+        assert sum(counts) == 1000
+        assert counts == sorted(counts, reverse=True), (
+            'Проверьте, что число отзывов убывает с рангом произведения'
+        )
+        assert counts[0] > 10 * counts[-1]
+
+    def test_cap_keeps_reviews_unique(self):
+        from reviews.management.commands.generate_data import zipf_counts
+
+        counts = zipf_counts(1000, 100, 2, cap=30)
+        assert max(counts) == 30
+        assert sum(counts) == 1000
+
+    def test_not_enough_users(self):
+        from reviews.management.commands.generate_data import zipf_counts
+
+        assert sum(zipf_counts(1000, 10, 1, cap=5)) == 50
+
+    def test_uniform(self):
+        from reviews.management.commands.generate_data import zipf_counts
+
+        assert zipf_counts(100, 10, 0, cap=100) == [10] * 10
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenerateData:
+
+    def generate(self, **options):
+        call_command(
+            'generate_data', users=30, categories=3, genres=5, titles=20,
+            reviews=200, comments=100, batch_size=7, **options)
+
+    def test_dataset(self):
+        from django.db.models import Count, Max, Min
+        from reviews.models import (
+            Category, Comment, Genre, GenreTitle, Review, Title)
+        from users.models import CustomUser
+
+        self.generate()
+        assert CustomUser.objects.count() == 30
+        assert Category.objects.count() == 3
+        assert Genre.objects.count() == 5
+        assert Title.objects.count() == 20
+        assert Review.objects.count() == 200
+        assert Comment.objects.count() == 100
+        assert not Title.objects.annotate(
+            genres=Count('genre')).filter(genres=0).exists()
+        per_title = Title.objects.annotate(
+            reviews_count=Count('reviews')).aggregate(
+            top=Max('reviews_count'), bottom=Min('reviews_count'))
+        assert per_title['top'] > 3 * per_title['bottom']
+        dates = Review.objects.aggregate(first=Min('pub_date'),
+                                         last=Max('pub_date'))
+        assert (dates['last'] - dates['first']).days > 30, (
+            'Проверьте, что даты отзывов распределены по периоду'
+        )
+        title = Title.objects.order_by('-review_count').first()
+        assert title.review_count == title.reviews.count()
+        assert title.rating is not None
+        assert GenreTitle.objects.count() >= 20
+
+    def test_deterministic(self):
+        from reviews.models import Review
+
+        self.generate()
+        first = list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score', 'text'))
+        Review.objects.all().delete()
+        from reviews.models import Category, Genre, Title
+        from users.models import CustomUser
+
+        for model in (Title, Category, Genre, CustomUser):
+            model.objects.all().delete()
+        self.generate()
+        second = list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score', 'text'))
+        offset_title = second[0][0] - first[0][0]
+        offset_user = second[0][1] - first[0][1]
+        assert second == [
+            (title + offset_title, author + offset_user, score, text)
+            for title, author, score, text in first
+        ]
+
+    def test_appends_to_existing_data(self, user, review):
+        from reviews.models import Review
+
+        self.generate()
+        assert Review.objects.count() == 201
+        review.refresh_from_db()
+        assert review.author == user
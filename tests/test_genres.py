@@ -0,0 +1,128 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def library(category, genres):
+    from reviews.models import Category, Genre, Title
+
+    book = Category.objects.create(name='Книга', slug='book')
+    horror = Genre.objects.create(name='Ужасы', slug='horror')
+    drama, comedy = genres
+    titles = {}
+    for name, year, title_category, title_genres in (
+            ('Драма', 2000, category, [drama]),
+            ('Трагикомедия', 2000, category, [drama, comedy]),
+            ('Комедия', 2010, category, [comedy]),
+            ('Книга ужасов', 2000, book, [drama, horror]),
+    ):
+        title = Title.objects.create(
+            name=name, year=year, description='', category=title_category)
+        title.genre.set(title_genres)
+        titles[name] = title
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGenreFilter:
+
+    def names(self, client, query):
+        response = client.get(f'/api/v1/titles/?{query}&limit=100')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == len(data['results'])
+        return sorted(item['name'] for item in data['results'])
+
+    def test_any_and_all(self, client, library):
+        assert self.names(client, 'genre=drama,comedy') == [
+            'Драма', 'Книга ужасов', 'Комедия', 'Трагикомедия'], (
+            'Проверьте, что по умолчанию подходят произведения с любым '
+            'из жанров, без повторов'
+        )
+        assert self.names(client, 'genre=drama,comedy&genre_mode=all') == [
+            'Трагикомедия'], (
+            'Проверьте, что genre_mode=all оставляет произведения со всеми '
+            'жанрами'
+        )
+        assert self.names(client, 'genre=comedy') == [
+            'Комедия', 'Трагикомедия']
+
+    def test_combines_with_other_filters(self, client, library):
+        assert self.names(client, 'genre=drama&category=movie') == [
+            'Драма', 'Трагикомедия']
+        assert self.names(
+            client, 'genre=drama,comedy&category=movie&year=2010') == [
+            'Комедия']
+
+    def test_unknown_genres(self, client, library):
+        assert self.names(client, 'genre=drama,western') == [
+            'Драма', 'Книга ужасов', 'Трагикомедия']
+        assert self.names(
+            client, 'genre=drama,western&genre_mode=all') == []
+        response = client.get('/api/v1/titles/?genre=drama&genre_mode=some')
+        assert response.status_code == 400
+
+    def test_mask_follows_genres(self, client, library, genres):
+        drama, comedy = genres
+        title = library['Драма']
+        title.genre.add(comedy)
+        assert 'Драма' in self.names(
+            client, 'genre=drama,comedy&genre_mode=all')
+        title.genre.remove(drama)
+        assert 'Драма' not in self.names(client, 'genre=drama')
+        comedy.title_set.clear()
+        assert self.names(client, 'genre=comedy') == [], (
+            'Проверьте, что маска жанров меняется вместе с жанрами'
+        )
+
+    def test_bit_of_purged_genre_is_reused(
+            self, admin_client, client, library):
+        from reviews.models import Genre
+
+        horror = Genre.objects.get(slug='horror')
+        assert admin_client.delete('/api/v1/genres/horror/').status_code == (
+            204)
+        call_command('run_worker', once=True)
+        western = Genre.objects.create(name='Вестерн', slug='western')
+        assert western.bit == horror.bit
+        assert self.names(client, 'genre=western') == [], (
+            'Проверьте, что бит удаленного жанра снимается с произведений'
+        )
+
+    def test_taken_bit_is_picked_again(self, monkeypatch, genres):
+        from django.db import IntegrityError
+        from reviews import models
+        from reviews.models import Genre
+
+        drama, comedy = genres
+        picks = [drama.bit]
+        free_genre_bit = models.free_genre_bit
+        # Another writer took the bit between the read and the insert.
+        monkeypatch.setattr(
+            models, 'free_genre_bit',
+            lambda: picks.pop() if picks else free_genre_bit())
+        western = Genre.objects.create(name='Вестерн', slug='western')
+        assert western.bit not in (None, drama.bit, comedy.bit), (
+            'Проверьте, что занятый бит жанра выбирается заново'
+        )
+        with pytest.raises(IntegrityError):
+            Genre.objects.create(name='Вестерн', slug='western')
+
+    def test_genre_without_bit(self, client, library, genres):
+        from reviews.models import Genre
+
+        Genre.objects.filter(slug='comedy').update(bit=None)
+        call_command('rebuild_genre_masks')
+        assert Genre.objects.get(slug='comedy').bit is not None
+        Genre.objects.filter(slug='comedy').update(bit=None)
+        assert self.names(client, 'genre=drama,comedy&genre_mode=all') == [
+            'Трагикомедия']
+        assert self.names(client, 'genre=comedy,horror') == [
+            'Книга ужасов', 'Комедия', 'Трагикомедия']
+
+    def test_rebuild_genre_masks(self, client, library):
+        from reviews.models import Title
+
+        Title.objects.update(genre_mask=0)
+        call_command('rebuild_genre_masks', chunk_size=1)
+        assert self.names(client, 'genre=horror') == ['Книга ужасов']
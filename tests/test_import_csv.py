@@ -0,0 +1,102 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+DUMP = {
+    'users.csv': [
+        ('id', 'username', 'email', 'role', 'bio', 'first_name',
+         'last_name'),
+        (100, 'bingobongo', 'bingo@yamdb.fake', 'user', '', '', ''),
+        (101, 'capt_obvious', 'capt@yamdb.fake', 'admin', '', '', ''),
+    ],
+    'category.csv': [('id', 'name', 'slug'), (1, 'Фильм', 'movie')],
+    'genre.csv': [('id', 'name', 'slug'), (1, 'Драма', 'drama')],
+    'titles.csv': [
+        ('id', 'name', 'year', 'category'),
+        (1, 'Побег из Шоушенка', 1994, 1),
+        (2, 'Без категории', 1994, 42),
+    ],
+    'genre_title.csv': [('id', 'title_id', 'genre_id'), (1, 1, 1)],
+    'review.csv': [
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Ставлю десять', 100, 10, '2019-09-24T21:08:21.567Z'),
+        (2, 1, 'Так себе', 101, 5, '2019-09-25T21:08:21.567Z'),
+    ],
+    'comments.csv': [
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        (1, 1, 'Согласен', 101, '2019-09-26T21:08:21.567Z'),
+    ],
+}
+
+
+@pytest.fixture
+def dump_dir(tmp_path):
+    for filename, rows in DUMP.items():
+        with open(tmp_path / filename, 'w', encoding='utf-8',
+                  newline='') as file:
+            csv.writer(file).writerows(rows)
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportCsv:
+
+    def test_import_directory(self, dump_dir):
+        from reviews.models import Comment, Review, Title
+
+        call_command('import_csv', dir=str(dump_dir), batch_size=1)
+        title = Title.objects.get(pk=1)
+        assert not Title.objects.filter(pk=2).exists(), (
+            'Проверьте, что строки с несуществующими ключами пропускаются'
+        )
+        assert list(title.genre.values_list('slug', flat=True)) == ['drama']
+        assert title.rating == 7, (
+            'Проверьте, что после импорта отзывов пересчитывается рейтинг'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берется из файла'
+        )
+        assert Comment.objects.get(pk=1).author.username == 'capt_obvious'
+
+    def test_import_is_repeatable(self, dump_dir):
+        from reviews.models import Review
+
+        call_command('import_csv', dir=str(dump_dir))
+        call_command('import_csv', file=str(dump_dir / 'review.csv'))
+        assert Review.objects.count() == 2
+
+    def test_bad_rows_are_reported_and_skipped(self, dump_dir):
+        from reviews.models import Review
+        from users.models import CustomUser
+
+        call_command('import_csv', dir=str(dump_dir))
+        path = dump_dir / 'review.csv'
+        with open(path, 'a', encoding='utf-8', newline='') as file:
+            csv.writer(file).writerows([
+                ('x', 1, 'Без id', 100, 8, '2019-09-27T21:08:21.567Z'),
+                (3, 1, 'Повторный', 100, 3, '2019-09-27T21:08:21.567Z'),
+                (4, 1, 'Оценка', 42, 3, '2019-09-27T21:08:21.567Z'),
+            ])
+        CustomUser.objects.create(
+            id=42, username='newcomer', email='new@yamdb.fake')
+        errors = StringIO()
+        call_command('import_csv', file=str(path), stderr=errors)
+        assert f'{path}:4:' in errors.getvalue()
+        assert f'{path}:5:' in errors.getvalue(), (
+            'Проверьте, что ошибочные строки выводятся с номером строки'
+        )
+        assert sorted(Review.objects.values_list('pk', flat=True)) == [
+            1, 2, 4], (
+            'Проверьте, что ошибочные строки пропускаются, а остальные '
+            'импортируются'
+        )
+
+    def test_import_expires_cached_lists(self, client, dump_dir):
+        assert client.get('/api/v1/categories/').json()['count'] == 0
+        call_command('import_csv', file=str(dump_dir / 'category.csv'))
+        assert client.get('/api/v1/categories/').json()['count'] == 1, (
+            'Проверьте, что после импорта кэшированные списки обновляются'
+        )
@@ -0,0 +1,104 @@
+import subprocess
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMetrics:
+
+    def test_request_is_measured(self, client, title):
+        labels = {'view': 'TitleViewSet', 'action': 'list'}
+        requests = sample('yamdb_request_duration_seconds_count', **labels)
+        queries = sample('yamdb_request_queries_sum', **labels)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert sample(
+            'yamdb_request_duration_seconds_count', **labels) == requests + 1
+        # count, page of titles, genres of the page
+        assert sample('yamdb_request_queries_sum', **labels) == queries + 3
+        assert sample('yamdb_response_size_bytes_sum', **labels) >= len(
+            response.content)
+        assert sample('yamdb_requests_total', status='200', **labels) >= 1
+
+    def test_detail_action_label(self, client, title):
+        client.get(f'/api/v1/titles/{title.id}/')
+        assert sample('yamdb_request_duration_seconds_count',
+                      view='TitleViewSet', action='retrieve') >= 1
+
+    def test_server_timing_header(self, client, title):
+        response = client.get('/api/v1/titles/')
+        timing = response['Server-Timing']
+        assert timing.startswith('total;dur=')
+        assert 'db;dur=' in timing and 'desc="3 queries"' in timing
+        assert 'serialize;dur=' in timing
+
+    def test_streamed_response_is_measured(self, client, settings, title):
+        settings.STREAMING_LIST_THRESHOLD = 1
+        labels = {'view': 'TitleViewSet', 'action': 'list'}
+        size = sample('yamdb_response_size_bytes_sum', **labels)
+        response = client.get('/api/v1/titles/?limit=5')
+        content = b''.join(response.streaming_content)
+        assert sample(
+            'yamdb_response_size_bytes_sum', **labels) == size + len(content)
+
+    def test_metrics_endpoint(self, client, title):
+        client.get('/api/v1/titles/')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        assert (b'yamdb_request_queries_bucket{action="list",'
+                b'le="3.0",view="TitleViewSet"}') in response.content
+
+    def test_metrics_of_all_workers(self, client, tmp_path, monkeypatch):
+        code = (
+            'from prometheus_client import Histogram\n'
+            'Histogram("yamdb_request_duration_seconds", "", '
+            '["view", "action"]).labels("Worker", "list").observe(0.1)\n'
+        )
+        for _ in range(2):
+            subprocess.run(
+                [sys.executable, '-c', code], check=True,
+                env={'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)})
+        monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+        response = client.get('/metrics')
+        assert (b'yamdb_request_duration_seconds_count{action="list",'
+                b'view="Worker"} 2.0') in response.content
+
+
+@pytest.mark.django_db(transaction=True)
+class TestProfile:
+
+    def get(self, client, user, profile='1'):
+        from users.tokens import RoleAccessToken
+
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}')
+        return client.get('/api/v1/titles/', HTTP_X_PROFILE=profile)
+
+    def test_admin_gets_profile(self, admin):
+        from rest_framework.test import APIClient
+
+        response = self.get(APIClient(), admin)
+        assert response.status_code == 200
+        assert 'ms ' in response['X-Profile'], (
+            'Проверьте, что администратор получает сводку cProfile'
+        )
+
+    def test_profile_is_opt_in(self, admin):
+        from rest_framework.test import APIClient
+
+        response = self.get(APIClient(), admin, profile='0')
+        assert not response.has_header('X-Profile')
+
+    def test_user_gets_no_profile(self, user):
+        from rest_framework.test import APIClient
+
+        response = self.get(APIClient(), user)
+        assert response.status_code == 200
+        assert not response.has_header('X-Profile')
@@ -0,0 +1,57 @@
+import pytest
+
+
+@pytest.fixture
+def other_title(category):
+    from reviews.models import Title
+
+    return Title.objects.create(
+        name='Другое', year=2000, description='', category=category)
+
+
+@pytest.fixture
+def comment(review, user):
+    from reviews.models import Comment
+
+    return Comment.objects.create(review=review, author=user, text='Да')
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNestedParents:
+
+    def test_mismatched_title_and_review(
+            self, client, user_client, other_title, review, comment):
+        url = f'/api/v1/titles/{other_title.id}/reviews/{review.id}/comments/'
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что комментарии отзыва другого произведения '
+            'недоступны'
+        )
+        assert client.get(f'{url}{comment.id}/').status_code == 404
+        response = user_client.post(url, {'text': 'Нет'})
+        assert response.status_code == 404
+
+    def test_comment_list_loads_parents_once(
+            self, client, title, review, comment, django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        # review joined with title, page with authors
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+
+    def test_review_create_loads_title_once(
+            self, another_user, title, review, django_assert_num_queries):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=another_user)
+        # title, duplicate check, BEGIN, insert, rating update
+        with django_assert_num_queries(5):
+            response = client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                {'text': 'Хорошо', 'score': 9})
+        assert response.status_code == 201
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Еще раз', 'score': 9})
+        assert response.status_code == 400
@@ -0,0 +1,151 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def many_reviews(title, django_user_model):
+    from django.utils import timezone
+    from reviews.models import Review
+
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'reader{i}', email=f'r{i}@yamdb.fake')
+        for i in range(25)
+    )
+    for author in django_user_model.objects.all():
+        Review.objects.create(title=title, author=author, text='', score=5)
+    # Equal dates make id the only tie-breaker of the cursor.
+    Review.objects.filter(pk__lte=10).update(pub_date=timezone.now())
+    return list(Review.objects.order_by('-pub_date', '-id')
+                .values_list('id', flat=True))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReviewCursorPagination:
+
+    def test_walk_pages_forward_and_back(self, client, title, many_reviews):
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=10'
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не считается общее число'
+            )
+            pages.append(data)
+            url = data['next']
+        ids = [item['id'] for page in pages for item in page['results']]
+        assert ids == many_reviews, (
+            'Проверьте, что курсор проходит все отзывы по (pub_date, id)'
+        )
+        assert pages[0]['previous'] is None
+        back = client.get(pages[-1]['previous']).json()
+        assert back['results'] == pages[-2]['results']
+
+    def test_cursor_page_does_not_count(self, client, title, many_reviews):
+        first = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=5').json()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(first['next'])
+        assert response.status_code == 200
+        assert not any('COUNT' in query['sql'] for query in queries)
+
+    def test_offset_contract_is_kept(self, client, title, many_reviews):
+        data = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?limit=10&offset=20').json()
+        assert data['count'] == 25
+        assert len(data['results']) == 5
+
+    def test_invalid_cursor(self, client, title):
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=garbage')
+        assert response.status_code == 404
+
+
+@pytest.fixture
+def titles(category):
+    from reviews.models import Title
+
+    return [
+        Title.objects.create(name=f'Фильм {i}', year=2000 + i % 2,
+                             description='', category=category)
+        for i in range(5)
+    ]
+
+
+def read(response):
+    if response.streaming:
+        return json.loads(b''.join(response.streaming_content))
+    return response.json()
+
+
+def count_queries(queries):
+    return [query for query in queries if 'COUNT' in query['sql']]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestApproximateCount:
+
+    def test_count_false(self, client, settings, titles):
+        for threshold in (1000, 2):
+            settings.STREAMING_LIST_THRESHOLD = threshold
+            with CaptureQueriesContext(connection) as queries:
+                data = read(client.get(
+                    '/api/v1/titles/?count=false&limit=2&offset=2'))
+            assert data['count'] is None, (
+                'Проверьте, что count=false отключает подсчет'
+            )
+            assert not count_queries(queries)
+            assert len(data['results']) == 2
+            assert 'offset=4' in data['next']
+            last = read(client.get(data['next']))
+            assert len(last['results']) == 1
+            assert last['next'] is None
+            assert last['previous']
+
+    def test_filtered_count_is_cached(self, client, category, titles):
+        from reviews.models import Title
+
+        url = '/api/v1/titles/?year=2000'
+        assert client.get(url).json()['count'] == 3
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).json()['count'] == 3
+        assert not count_queries(queries), (
+            'Проверьте, что точный count фильтрованного списка кэшируется'
+        )
+        Title.objects.create(
+            name='Новый', year=2000, description='', category=category)
+        assert client.get(url).json()['count'] == 4, (
+            'Проверьте, что кэш count сбрасывается при изменениях'
+        )
+
+    def test_planner_estimate_for_unfiltered(
+            self, monkeypatch, settings, titles):
+        from api import counts
+        from reviews.models import Title
+
+        monkeypatch.setattr(
+            counts, 'planner_estimate', lambda queryset: 123456)
+        settings.COUNT_ESTIMATE_THRESHOLD = 100000
+        assert counts.approximate_count(Title.objects.all()) == 123456
+        assert counts.approximate_count(
+            Title.objects.filter(year=2001)) == 2
+        assert counts.approximate_count(Title.objects.none()) == 0
+        settings.COUNT_ESTIMATE_THRESHOLD = 200000
+        assert counts.approximate_count(Title.objects.order_by('name')) == 5
+
+    def test_admin_changelist_counts_once(self, client, titles):
+        from django.contrib.auth import get_user_model
+
+        client.force_login(get_user_model().objects.create_superuser(
+            'root@yamdb.fake', 'root', 'password'))
+        client.get('/admin/reviews/title/')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/admin/reviews/title/')
+        assert response.status_code == 200
+        assert not count_queries(queries), (
+            'Проверьте, что список админки не считает строки заново'
+        )
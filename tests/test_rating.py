@@ -0,0 +1,51 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleRating:
+
+    def refresh(self, title):
+        title.refresh_from_db()
+        return title.rating, title.score_sum, title.review_count
+
+    def test_rating_follows_reviews(self, title, user, another_user):
+        from reviews.models import Review
+
+        assert self.refresh(title) == (None, 0, 0), (
+            'Проверьте, что у произведения без отзывов нет рейтинга'
+        )
+        first = Review.objects.create(
+            title=title, author=user, text='a', score=8)
+        second = Review.objects.create(
+            title=title, author=another_user, text='b', score=5)
+        assert self.refresh(title) == (6, 13, 2), (
+            'Проверьте, что рейтинг пересчитывается при создании отзыва'
+        )
+        first.score = 10
+        first.save()
+        assert self.refresh(title) == (7, 15, 2), (
+            'Проверьте, что рейтинг пересчитывается при изменении отзыва'
+        )
+        second.delete()
+        assert self.refresh(title) == (10, 10, 1), (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+        )
+        Review.objects.get(pk=first.pk).delete()
+        assert self.refresh(title) == (None, 0, 0)
+
+    def test_rebuild_ratings(self, title, review):
+        from reviews.models import Title
+
+        Title.objects.update(rating=None, score_sum=0, review_count=0)
+        call_command('rebuild_ratings', chunk_size=1)
+        assert self.refresh(title) == (7, 7, 1), (
+            'Проверьте, что команда rebuild_ratings восстанавливает рейтинг'
+        )
+
+    def test_title_list_reads_stored_rating(
+            self, client, title, review, django_assert_max_num_queries):
+        with django_assert_max_num_queries(5):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['results'][0]['rating'] == 7
@@ -0,0 +1,88 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+
+
+@contextmanager
+def capture():
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        yield primary, replica
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica(self, client, replicas, title):
+        with capture() as (primary, replica):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+        assert len(primary) == 0, (
+            'Проверьте, что чтение идёт с реплики'
+        )
+        assert len(replica) == 3
+
+    def test_streamed_reads_go_to_replica(
+            self, client, settings, replicas, title):
+        settings.STREAMING_LIST_THRESHOLD = 1
+        with capture() as (primary, replica):
+            response = client.get('/api/v1/titles/?limit=5')
+            b''.join(response.streaming_content)
+        assert len(primary) == 0
+        assert len(replica) == 3
+
+    def test_reads_stick_to_primary_after_write(
+            self, user_client, replicas, title):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Отзыв', 'score': 8}, format='json')
+        assert response.status_code == 201
+        assert 'primary_until' in response.cookies
+        with capture() as (primary, replica):
+            response = user_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.json()['count'] == 1
+        assert len(replica) == 0, (
+            'Проверьте, что после записи клиент читает с основной базы'
+        )
+
+    def test_sticky_window_expires(self, client, settings, replicas, title):
+        client.cookies['primary_until'] = str(time.time() - 1)
+        with capture() as (primary, replica):
+            client.get('/api/v1/titles/')
+        assert len(primary) == 0
+        assert len(replica) == 3
+
+    def test_failed_write_does_not_stick(self, user_client, replicas, title):
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/', {}, format='json')
+        assert response.status_code == 400
+        assert 'primary_until' not in response.cookies
+
+    def test_view_opts_out(self, admin_client, replicas, admin):
+        with capture() as (primary, replica):
+            response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 200
+        assert len(replica) == 0
+        assert len(primary) > 0
+
+    def test_no_replicas_configured(self, client, title):
+        with capture() as (primary, replica):
+            client.get('/api/v1/titles/')
+        assert len(replica) == 0
+        assert len(primary) == 3
+
+    def test_outside_requests_read_primary(self, replicas, title):
+        from reviews.models import Title
+
+        with capture() as (primary, replica):
+            assert Title.objects.get(pk=title.pk) == title
+        assert len(replica) == 0
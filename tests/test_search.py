@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.fixture
+def titles(category):
+    from reviews.models import Title
+
+    return [
+        Title.objects.create(name=name, year=2000, description=description,
+                             category=category)
+        for name, description in (
+            ('Побег из Шоушенка', 'Тюремная драма'),
+            ('Шоу Трумана', 'Жизнь в шоу'),
+            ('Зеленая миля', 'Тоже про тюрьму'),
+        )
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleSearch:
+
+    def names(self, client, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    def test_name_is_case_insensitive(self, client, titles):
+        assert self.names(client, 'name=шоу') == [
+            'Шоу Трумана', 'Побег из Шоушенка'], (
+            'Проверьте, что поиск по названию не зависит от регистра и '
+            'упорядочен по релевантности'
+        )
+
+    def test_q_searches_description(self, client, titles):
+        assert set(self.names(client, 'q=тюрем')) == {'Побег из Шоушенка'}
+        assert set(self.names(client, 'q=тюр')) == {
+            'Побег из Шоушенка', 'Зеленая миля'}
+
+    def test_name_and_q_together(self, client, titles):
+        assert self.names(client, 'name=шоу&q=шоу') == [
+            'Шоу Трумана', 'Побег из Шоушенка'], (
+            'Проверьте, что name и q можно передать вместе'
+        )
+        assert self.names(client, 'name=шоу&q=тюрем') == [
+            'Побег из Шоушенка']
+        assert self.names(client, 'q=тюр&name=ми') == ['Зеленая миля']
+        assert self.names(client, 'name=миля&q=шоу') == []
+
+    def test_short_query(self, client, titles):
+        assert self.names(client, 'name=ел') == ['Зеленая миля']
+
+    def test_index_follows_title_changes(self, client, titles, category):
+        from reviews.models import Title
+
+        title = titles[2]
+        title.name = 'Мгла'
+        title.save()
+        assert self.names(client, 'name=миля') == []
+        assert self.names(client, 'name=мгла') == ['Мгла']
+        title.delete()
+        assert self.names(client, 'name=мгла') == []
+        Title.objects.create(name='Мгла 2', year=2001, description='',
+                             category=category)
+        assert self.names(client, 'name=мгла') == ['Мгла 2']
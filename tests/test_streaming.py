@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def many_titles(category, genres):
+    from reviews.models import Title
+
+    titles = Title.objects.bulk_create(
+        Title(name=f'Фильм {i}', year=2000 + i, category=category)
+        for i in range(7)
+    )
+    for title in Title.objects.all():
+        title.genre.set(genres)
+    return titles
+
+
+def read(response):
+    return json.loads(b''.join(response.streaming_content))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStreamingList:
+
+    def test_large_page_is_streamed(self, client, settings, many_titles):
+        expected = client.get('/api/v1/titles/?limit=5&offset=1').json()
+        settings.STREAMING_LIST_THRESHOLD = 5
+        settings.STREAMING_CHUNK_SIZE = 2
+        response = client.get('/api/v1/titles/?limit=5&offset=1')
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что большая страница отдаётся потоком'
+        )
+        assert response['Content-Type'] == 'application/json'
+        assert read(response) == expected, (
+            'Проверьте, что потоковый ответ совпадает с обычным'
+        )
+
+    def test_small_page_is_not_streamed(self, client, settings, many_titles):
+        settings.STREAMING_LIST_THRESHOLD = 5
+        response = client.get('/api/v1/titles/?limit=4')
+        assert not response.streaming
+        assert len(response.json()['results']) == 4
+
+    def test_genres_prefetched_per_chunk(
+            self, client, settings, many_titles, django_assert_num_queries):
+        settings.STREAMING_LIST_THRESHOLD = 5
+        settings.STREAMING_CHUNK_SIZE = 3
+        response = client.get('/api/v1/titles/?limit=100')
+        # The count is taken in the view, the body reads the page and
+        # one genre query for each of three chunks.
+        with django_assert_num_queries(4):
+            data = read(response)
+        assert data['count'] == 7
+        assert data['next'] is None
+        assert all(len(item['genre']) == 2 for item in data['results'])
+
+    def test_reviews_keep_envelope(self, client, settings, title, review):
+        settings.STREAMING_LIST_THRESHOLD = 1
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/?limit=1')
+        data = read(response)
+        assert list(data) == ['count', 'next', 'previous', 'results']
+        assert data['results'][0]['id'] == review.id
+
+    def test_cursor_pages_are_not_streamed(
+            self, client, settings, title, review):
+        settings.STREAMING_LIST_THRESHOLD = 1
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=1')
+        assert not response.streaming
+        assert 'count' not in response.json()
@@ -0,0 +1,118 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTaskQueue:
+
+    def test_signup_mail_is_sent_by_worker(self, client, django_user_model):
+        from tasks.models import Task
+
+        response = client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'newbie', 'email': 'newbie@yamdb.fake'})
+        assert response.status_code == 200
+        assert django_user_model.objects.filter(username='newbie').exists()
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что письмо не отправляется в запросе регистрации'
+        )
+        assert Task.objects.get().status == 'pending'
+        call_command('run_worker', once=True)
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['newbie@yamdb.fake']
+        assert 'confirmation code' in mail.outbox[0].body
+        assert Task.objects.get().status == 'done'
+
+    def test_batch_is_sent_over_one_connection(self):
+        from tasks.queue import enqueue
+
+        for i in range(3):
+            enqueue('send_mail', subject='Hi', message='', from_email='a@b.c',
+                    recipient_list=[f'user{i}@yamdb.fake'])
+        call_command('run_worker', once=True, batch_size=10)
+        assert len(mail.outbox) == 3
+
+    def test_failed_task_is_retried_with_backoff(self, settings):
+        from django.utils import timezone
+        from tasks.models import Task
+        from tasks.queue import claim, run
+
+        settings.TASKS_MAX_ATTEMPTS = 2
+        task = Task.objects.create(name='missing')
+        assert run(claim(10)) == 1
+        task.refresh_from_db()
+        assert task.status == 'pending' and task.attempts == 1
+        assert task.run_at > timezone.now(), (
+            'Проверьте, что повтор откладывается'
+        )
+        assert claim(10) == []
+        Task.objects.update(run_at=timezone.now())
+        run(claim(10))
+        task.refresh_from_db()
+        assert task.status == 'failed'
+        assert 'missing' in task.last_error
+
+    def test_task_is_claimed_once(self):
+        from tasks.queue import claim, enqueue
+
+        enqueue('send_mail', subject='', message='', from_email='a@b.c',
+                recipient_list=['x@yamdb.fake'])
+        assert len(claim(10)) == 1
+        assert claim(10) == []
+
+    def test_stats(self):
+        from tasks.queue import enqueue, stats
+
+        enqueue('send_mail', subject='', message='', from_email='a@b.c',
+                recipient_list=['x@yamdb.fake'])
+        assert stats()['pending'] == 1
+        call_command('run_worker', once=True)
+        metrics = stats()
+        assert metrics['pending'] == 0 and metrics['done'] == 1
+        assert metrics['latency_p99'] >= 0
+
+    def test_lost_task_counts_as_attempt(self, settings):
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from tasks.models import Task
+        from tasks.queue import claim
+
+        settings.TASKS_MAX_ATTEMPTS = 2
+        task = Task.objects.create(name='purge')
+        assert claim(10)
+        for attempts in (1, 2):
+            Task.objects.update(
+                locked_at=timezone.now() - timedelta(
+                    seconds=settings.TASKS_LOCK_TIMEOUT + 1))
+            claim(10)
+            task.refresh_from_db()
+            assert task.attempts == attempts
+        assert task.status == 'failed', (
+            'Проверьте, что задача, из-за которой падает обработчик, '
+            'не забирается бесконечно'
+        )
+        assert claim(10) == []
+
+    def test_sent_mails_are_not_resent(self, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+        from django.utils import timezone
+        from tasks.models import Task
+        from tasks.queue import enqueue
+
+        for i in range(2):
+            enqueue('send_mail', subject='Hi', message='', from_email='a@b.c',
+                    recipient_list=[f'user{i}@yamdb.fake'])
+
+        def close(backend):
+            raise ConnectionError('SMTP connection lost')
+
+        monkeypatch.setattr(EmailBackend, 'close', close)
+        call_command('run_worker', once=True, batch_size=10)
+        Task.objects.update(run_at=timezone.now())
+        call_command('run_worker', once=True, batch_size=10)
+        assert len(mail.outbox) == 2, (
+            'Проверьте, что уже отправленные письма не отправляются повторно'
+        )
+        assert set(Task.objects.values_list('status', flat=True)) == {'done'}
@@ -0,0 +1,189 @@
+import pytest
+
+
+@pytest.fixture
+def many_titles(category, genres):
+    from reviews.models import GenreTitle, Title
+
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000, description='',
+              category=category)
+        for i in range(1000)
+    )
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in Title.objects.all()
+        for genre in genres
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleQueries:
+
+    @pytest.mark.parametrize('limit', [10, 100, 1000])
+    def test_title_list_query_count(
+            self, client, settings, many_titles, limit,
+            django_assert_num_queries):
+        # Streamed pages query genres per chunk, see test_streaming.
+        settings.STREAMING_LIST_THRESHOLD = limit + 1
+        # count, page of titles with categories, genres of the page
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == limit
+        assert all(len(item['genre']) == 2 for item in results), (
+            'Проверьте, что в списке произведений выводятся все жанры'
+        )
+        assert all(item['category']['slug'] == 'movie' for item in results)
+
+    def test_title_detail_query_count(
+            self, client, title, review, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['rating'] == 7
+        assert {genre['slug'] for genre in data['genre']} == {
+            'drama', 'comedy'}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleFields:
+
+    @pytest.mark.parametrize('compiled', [True, False])
+    def test_list_fields(
+            self, client, settings, title, compiled,
+            django_assert_num_queries):
+        settings.COMPILED_SERIALIZERS = compiled
+        # count, page without joins or genre queries
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/?fields=id,name')
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'id': title.id, 'name': 'Чапаев'}], (
+            'Проверьте, что параметр fields оставляет только указанные поля'
+        )
+
+    def test_detail_fields(self, client, title, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = client.get(f'/api/v1/titles/{title.id}/?fields=name')
+        assert response.json() == {'name': 'Чапаев'}
+
+    def test_omit(self, client, title, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/?omit=genre,category')
+        item = response.json()['results'][0]
+        assert 'genre' not in item and 'category' not in item, (
+            'Проверьте, что параметр omit убирает указанные поля'
+        )
+        assert item['name'] == 'Чапаев' and item['rating'] is None
+        response = client.get(
+            f'/api/v1/titles/{title.id}/?fields=id,genre&omit=id')
+        assert {genre['slug'] for genre in response.json()['genre']} == {
+            'drama', 'comedy'}
+
+    def test_unknown_field(self, client, title):
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400
+        assert 'secret' in response.json()['fields'][0]
+
+    def test_fields_do_not_limit_writes(
+            self, admin_client, category, genres):
+        response = admin_client.post(
+            '/api/v1/titles/?fields=id',
+            {'name': 'Новое', 'year': 2000, 'description': 'Описание',
+             'category': 'movie', 'genre': ['drama']}, format='json')
+        assert response.status_code == 201
+        assert response.json()['name'] == 'Новое'
+
+
+@pytest.fixture
+def ranked_titles(category):
+    from reviews.models import Category, Title
+
+    other = Category.objects.create(name='Книга', slug='book')
+    for name, year, rating, review_count, title_category in (
+            ('Б', 2001, 8, 3, category),
+            ('А', 1999, None, 0, category),
+            ('В', 2001, 9, 1, category),
+            ('Г', 1990, 8, 5, other),
+    ):
+        title = Title.objects.create(
+            name=name, year=year, description='', category=title_category)
+        Title.objects.filter(pk=title.pk).update(
+            rating=rating, review_count=review_count)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleOrdering:
+
+    def names(self, client, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    def test_orderings(self, client, ranked_titles):
+        assert self.names(client, 'ordering=-rating') == [
+            'В', 'Г', 'Б', 'А'], (
+            'Проверьте, что произведения без рейтинга идут в конце, '
+            'а равные значения упорядочены по id'
+        )
+        assert self.names(client, 'ordering=year') == ['Г', 'А', 'Б', 'В']
+        assert self.names(client, 'ordering=-review_count') == [
+            'Г', 'Б', 'В', 'А']
+        assert self.names(client, 'ordering=name') == ['А', 'Б', 'В', 'Г']
+        assert self.names(client, 'ordering=-year,-rating') == [
+            'В', 'Б', 'А', 'Г']
+
+    def test_with_filters_and_pages(self, client, ranked_titles):
+        assert self.names(
+            client, 'ordering=-rating&category=movie&limit=1&offset=1') == [
+            'Б']
+        assert self.names(client, 'ordering=year&name=Г') == ['Г']
+
+    def test_only_allowed_fields(self, client, ranked_titles):
+        for ordering in ('description', '-score_sum', 'rating,genre_mask'):
+            response = client.get(f'/api/v1/titles/?ordering={ordering}')
+            assert response.status_code == 400, (
+                'Проверьте, что сортировка разрешена только по rating, '
+                'year, review_count и name'
+            )
+
+    @pytest.mark.parametrize('query', [
+        {'ordering': '-rating'},
+        {'ordering': 'name', 'category': 'movie'},
+        {'ordering': '-review_count', 'category': 'movie'},
+    ])
+    def test_ordering_uses_index(self, query, ranked_titles):
+        from api.filters import TitleFilter
+        from django.db import connection
+        from reviews.models import Title
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('plan text is SQLite-specific')
+        queryset = TitleFilter(query, queryset=Title.objects.all()).qs[:10]
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'INDEX title_' in plan
+        assert 'TEMP B-TREE' not in plan, (
+            'Проверьте, что сортировка идет по индексу, без сортировки '
+            'в памяти'
+        )
+
+    def test_category_filter_by_id(self, ranked_titles):
+        from api.filters import TitleFilter
+        from reviews.models import Title
+
+        queryset = TitleFilter(
+            {'category': 'movie'}, queryset=Title.objects.all()).qs
+        sql = str(queryset.query)
+        assert 'JOIN' not in sql and '"category_id" = (SELECT' in sql, (
+            'Проверьте, что фильтр по категории сравнивает category_id '
+            'без соединения с таблицей категорий'
+        )
+        assert queryset.count() == 3
+        assert not TitleFilter(
+            {'category': 'missing'}, queryset=Title.objects.all()).qs.exists()